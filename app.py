@@ -1,16 +1,20 @@
 # Import required libraries
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, Response
-from datetime import datetime, date
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, Response, stream_with_context, g
+from datetime import datetime, date, timedelta
 from flask_bootstrap5 import Bootstrap
 from flask_sqlalchemy import SQLAlchemy
 import smtplib
 import os
+import json
+import click
+import base64
+import time
 from dotenv import load_dotenv
 from flask_ckeditor import CKEditor
 # from flask_gravatar import Gravatar
 # from gravatar import Gravatar
 from flask_login import UserMixin, login_user, LoginManager, current_user, logout_user, login_required
-from sqlalchemy.orm import relationship, DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.orm import relationship, DeclarativeBase, Mapped, mapped_column, validates, aliased
 from sqlalchemy import Integer, String, Text
 from functools import wraps
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -22,9 +26,22 @@ from flask_migrate import Migrate
 from urllib.parse import urlparse, urljoin, urlencode
 from hashlib import md5
 import requests
-from middleware import SEOMiddleware
+from middleware import SEOMiddleware, CompressionMiddleware, set_post_seo
+from storage import create_storage
+from images import new_cover_key, render_derivatives, cover_variant, detect_format
+from suggest import SuggestIndex
+from slugs import slugify
+from ratelimit import RateLimiter, MemoryBuckets, SQLiteBuckets
+from freeze import FrozenPages, templates_fingerprint
+from urllib.parse import unquote
+import glob
+from concurrent.futures import ThreadPoolExecutor
 from flask import send_from_directory
 from werkzeug.middleware.proxy_fix import ProxyFix
+from jinja2 import TemplateError, FileSystemBytecodeCache
+from template_cache import FragmentCacheExtension, FragmentCache
+from cache import Cache, LRUBackend, create_cache
+from profiler import Profiler
 
 # Load environment variables
 load_dotenv()
@@ -50,14 +67,67 @@ def gravatar_url(email, size=100, rating='g', default='retro', force_default=Fal
 
     return f"https://www.gravatar.com/avatar/{email_hash}?{urlencode(query_params)}"
 
+
+# Gravatar URLs are cheaper to build than a network round trip, so they stay in a per-process LRU
+local_cache = Cache(LRUBackend(max_entries=4096))
+
+
+def cached_gravatar_url(email, size=100, rating='g', default='retro', force_default=False):
+    return local_cache.get_or_set(
+        "gravatar", f"{email}|{size}|{rating}|{default}|{force_default}", 86400,
+        lambda: gravatar_url(email, size, rating, default, force_default),
+    )
+
 # Initialize Flask application
 app = Flask(__name__)
 
 # Trust Render’s proxy (1 proxy layer, if applicable)
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
-# Add the filter for Jinja templates
-app.jinja_env.filters['gravatar'] = gravatar_url
+# Static export: "off", "pages" (content-only pages) or "all" (pages plus published posts)
+FREEZE_MODE = os.getenv('FREEZE_PAGES', 'off')
+SITE_URL = os.getenv('SITE_URL', 'https://alhadarwebsite.onrender.com')
+
+# How long browsers and shared caches may keep public pages, frozen or rendered by Flask
+PUBLIC_CACHE_MAX_AGE = int(os.getenv('PUBLIC_CACHE_MAX_AGE', 300))
+
+# Serve frozen pages before Flask runs; visitors with a session or remember-me cookie always get Flask
+frozen_pages = FrozenPages(
+    app.wsgi_app,
+    os.getenv('FROZEN_PAGES_DIR', os.path.join(app.instance_path, 'frozen')),
+    {app.config['SESSION_COOKIE_NAME'], 'remember_token'},
+    max_age=PUBLIC_CACHE_MAX_AGE,
+)
+app.wsgi_app = frozen_pages
+
+# Compress HTML/JSON/XML (frozen pages included) for clients that accept gzip or brotli
+app.wsgi_app = CompressionMiddleware(
+    app.wsgi_app,
+    min_size=int(os.getenv('COMPRESS_MIN_SIZE', 500)),
+    level=int(os.getenv('COMPRESS_LEVEL', 6)),
+    brotli_quality=int(os.getenv('COMPRESS_BROTLI_QUALITY', 4)),
+    stream_buffer=int(os.getenv('COMPRESS_STREAM_BUFFER', 32768)),
+)
+
+# Cache shared by the workers: CACHE_BACKEND=memory (per worker), sqlite (per host, CACHE_URL is the
+# file) or redis (CACHE_URL is a redis:// URL)
+cache_backend = os.getenv('CACHE_BACKEND', 'memory')
+shared_cache = create_cache(
+    cache_backend,
+    os.getenv('CACHE_URL', os.path.join(app.instance_path, 'cache.sqlite3') if cache_backend == 'sqlite' else None),
+)
+
+# Share compiled templates between workers and restarts, and enable {% cache %} fragments
+jinja_cache_dir = os.getenv('JINJA_BYTECODE_CACHE_DIR', os.path.join(app.instance_path, 'jinja-cache'))
+os.makedirs(jinja_cache_dir, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(jinja_cache_dir)
+app.jinja_env.add_extension(FragmentCacheExtension)
+app.jinja_env.fragment_cache = FragmentCache(shared_cache)
+
+# Add the filters for Jinja templates
+app.jinja_env.filters['gravatar'] = cached_gravatar_url
+app.jinja_env.filters['cover_variant'] = cover_variant
+app.jinja_env.filters['slugify'] = slugify
 
 # Email setup for Flask-Mail (ensure your credentials are in .env file)
 app.config['MAIL_SERVER'] = 'smtp.gmail.com'  # e.g., smtp.gmail.com for Gmail
@@ -72,6 +142,7 @@ app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MY_WEBSITE_EMAIL')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY') # Secret key for sessions
 app.config['CKEDITOR_PKG_TYPE'] = 'full'
+app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # Cover image uploads
 
 # Initialize Flask extensions
 ckeditor = CKEditor(app)
@@ -86,6 +157,28 @@ HCAPTCHA_SECRET_KEY = os.getenv('HCAPTCHA_SECRET_KEY')
 # Register SEO Middleware
 SEOMiddleware(app)
 
+# Uploaded cover images: local folder in development, Supabase Storage in production (IMAGE_STORAGE)
+storage = create_storage(app, lambda: supabase)
+
+# Rate limits for endpoints that hash passwords, send mail or call hCaptcha. RATE_LIMIT_BACKEND=sqlite
+# shares the buckets between the workers on one host; "memory" keeps them per worker
+if os.getenv('RATE_LIMIT_BACKEND', 'memory') == 'sqlite':
+    rate_limit_buckets = SQLiteBuckets(os.getenv('RATE_LIMIT_DB', os.path.join(app.instance_path, 'ratelimit.sqlite3')))
+else:
+    rate_limit_buckets = MemoryBuckets()
+rate_limiter = RateLimiter(rate_limit_buckets, enabled=os.getenv('RATE_LIMIT_ENABLED', '1') == '1')
+
+# Concurrency caps are per worker, so they only bite when set below its thread count (see gunicorn.conf.py)
+WORKER_THREADS = int(os.getenv('GUNICORN_THREADS', 4))
+HASHING_CONCURRENCY = max(1, WORKER_THREADS // 4)  # login and register spend ~100 ms of CPU hashing
+SHARED_CONCURRENCY = max(1, WORKER_THREADS // 2)  # Search, likes and outgoing mail
+
+# Admin-only request profiling (?_profile=1 or an X-Profile: 1 header); reports are kept in PROFILE_DIR
+profiler = Profiler(os.getenv('PROFILE_DIR', os.path.join(app.instance_path, 'profiles')))
+
+# Image resizing and page re-rendering run off the request thread; the pool starts its thread lazily, so it is safe to preload
+background_executor = ThreadPoolExecutor(max_workers=1)
+
 # Initialize the database
 class Base(DeclarativeBase):
     pass
@@ -100,6 +193,9 @@ migrate = Migrate(app, db)
 # Current year for dynamic copyright in templates
 year = datetime.today().year
 
+# Password reset links expire after an hour
+RESET_TOKEN_MAX_AGE = 3600
+
 # Database tables: Define your models here with placeholder descriptions
 
 # Post table (Example: A blog post with title, body, etc.)
@@ -113,11 +209,26 @@ class Post(db.Model):
     body: Mapped[str] = mapped_column(Text, nullable=False)
     img_url: Mapped[str] = mapped_column(String, nullable=False)
     category: Mapped[str] = mapped_column(String, nullable=False)
+    # URL forms of category and title, kept in step by the validators below (see migrations/)
+    category_slug: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    post_slug: Mapped[str] = mapped_column(String, nullable=False, index=True)
     status: Mapped[str] = mapped_column(String, nullable=False, default="published")  # "draft" or "published"
     scheduled_datetime: Mapped[datetime] = mapped_column(db.DateTime, nullable=True)
     comments = relationship("Comment", back_populates="parent_post")
     views: Mapped[int] = mapped_column(Integer, default=0)
     likes: Mapped[int] = mapped_column(Integer, default=0)
+    # Comments and replies on the post, counted up by show_post (see the reconcile-comment-counts job)
+    comment_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    @validates("category")
+    def _set_category_slug(self, key, value):
+        self.category_slug = slugify(value)
+        return value
+
+    @validates("title")
+    def _set_post_slug(self, key, value):
+        self.post_slug = slugify(value)
+        return value
 
 # User table (Handles user registration, login, and profile)
 class User(UserMixin, db.Model):
@@ -140,6 +251,8 @@ class Comment(db.Model):
     text: Mapped[str] = mapped_column(Text, nullable=False)
     parent_id: Mapped[int] = mapped_column(Integer, db.ForeignKey("comments.id"), nullable=True)
     parent_comment = relationship("Comment", remote_side=[id], backref="replies")
+    # Direct replies, counted up with Post.comment_count
+    reply_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
 # Password reset token table
 # noinspection PyDeprecation
@@ -156,6 +269,43 @@ with app.app_context():
     db.create_all()
 
 
+# Callbacks run as hook(post_id) after a post is created, edited or deleted
+post_change_hooks = []
+
+
+def notify_posts_changed(post_id):
+    for hook in post_change_hooks:
+        hook(post_id)
+
+
+# Cached post listings, categories and template fragments all derive from posts
+post_change_hooks.append(lambda post_id: shared_cache.invalidate("posts"))
+post_change_hooks.append(lambda post_id: app.jinja_env.fragment_cache.clear())
+
+# Columns the listing templates read; rows are cached as dicts, which Jinja reads like posts
+LISTING_COLUMNS = (
+    Post.id, Post.title, Post.date, Post.category, Post.category_slug, Post.img_url, Post.body, Post.comment_count,
+)
+
+
+def published_posts(category_slug=None):
+    """Published posts of one category (or all of them) for listing pages, through shared_cache."""
+    def load():
+        stmt = db.select(*LISTING_COLUMNS).where(Post.status == "published")
+        if category_slug is not None:
+            stmt = stmt.where(Post.category_slug == category_slug)
+        return [dict(row._mapping) for row in db.session.execute(stmt.order_by(Post.id))]
+    return shared_cache.get_or_set("posts", f"listing:{category_slug}", 300, load)
+
+
+@app.template_global()
+def published_categories():
+    """Category names for the sidebars, through shared_cache."""
+    return shared_cache.get_or_set("posts", "categories", 300, lambda: db.session.scalars(
+        db.select(Post.category).where(Post.status == "published").distinct().order_by(Post.category)
+    ).all())
+
+
 # Static Routes
 @app.route('/favicon.ico')
 def favicon():
@@ -195,20 +345,80 @@ def ads_txt():
     return send_from_directory('static', 'ads.txt', mimetype='text/plain')
 
 
-# URL Normalization (ensure lowercase paths)
+# Per-request profiling for the admin; registered first so it also covers the other request hooks
+def profiling_requested():
+    return (request.args.get('_profile') or request.headers.get('X-Profile')) and \
+        current_user.is_authenticated and current_user.id == 1
+
+
+@app.before_request
+def start_profile():
+    if profiling_requested():
+        g.profile = profiler.start(f"{request.method} {request.full_path.rstrip('?')}")
+
+
+@app.after_request
+def finish_profile(response):
+    profile = g.pop('profile', None)
+    if profile is None:
+        return response
+    profiler.stop(profile)
+    name = profiler.save(profile)
+    if request.args.get('_profile') == 'report':
+        # Return the report in place of the page
+        response = Response(profile.report(), mimetype='text/plain')
+    response.headers['X-Profile-Report'] = url_for('profile_report', filename=f"{name}.txt")
+    return response
+
+
+@app.teardown_request
+def abandon_profile(exc):
+    # after_request is skipped when the view raises; don't leave the profiler running on this thread
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profiler.stop(profile)
+        profiler.save(profile)
+
+
+# URL Normalization (category slugs and lowercase paths)
 @app.before_request
 def normalize_url():
-    # Only normalize category-based URLs (if necessary)
-    if "category" in request.view_args:
-        category = request.view_args["category"]
-        # Normalize only the category part to lowercase
-        request.view_args["category"] = category.lower()
+    # Category-based URLs use the stored slug; older links ("/Türkiye-Geçilmez/post/40") are moved to it
+    category = (request.view_args or {}).get("category")
+    if category:
+        slug = slugify(category)
+        if slug != category and request.method in ("GET", "HEAD"):
+            values = {**request.args.to_dict(flat=False), **request.view_args, "category": slug}
+            return redirect(url_for(request.endpoint, **values), code=301)
+        request.view_args["category"] = slug
+        return None  # The rest of these URLs is fixed text and numbers, so the path is already canonical
 
     # Redirect if the entire URL path is not in lowercase (except for static files)
     if request.path != request.path.lower() and not request.path.startswith('/static/'):
         return redirect(request.path.lower(), code=301)
 
 
+# Content pages whose anonymous GETs leave the session alone, so shared caches (CDN, proxies) may store them
+CACHEABLE_ENDPOINTS = {
+    "home", "about", "blogs", "show_category", "show_post", "projects", "cvresume", "ugescapades",
+    "random_musings", "turkiyegecilmez", "audacity", "portfolio", "search", "disclaimer", "privacy_policy",
+    "terms_and_conditions", "api_posts", "api_post", "api_categories", "api_comments",
+}
+
+
+@app.after_request
+def set_cache_control(response):
+    if request.method not in ("GET", "HEAD") or request.endpoint not in CACHEABLE_ENDPOINTS:
+        return response
+    if current_user.is_authenticated or session.modified:
+        # Personalised (admin links, flashed messages): browsers only
+        response.cache_control.private = True
+    elif response.status_code == 200:
+        response.cache_control.public = True
+        response.cache_control.max_age = PUBLIC_CACHE_MAX_AGE
+    return response
+
+
 # Admin-only wrapper for routes
 def admin_only(func):
     @wraps(func)
@@ -224,6 +434,7 @@ def admin_only(func):
 # Route for user registration
 # noinspection PyArgumentList
 @app.route('/register', methods=['GET', 'POST'])
+@rate_limiter.limit("register", rate=3 / 60, burst=3, concurrency=HASHING_CONCURRENCY, methods=("POST",))
 def register():
     form = RegisterForm()
     if form.validate_on_submit():
@@ -252,10 +463,16 @@ def load_user(user_id):
 
 
 def is_safe_url(target):
-    """Validate that the redirect URL is safe and within the same site."""
-    ref_url = urlparse(request.host_url)
-    test_url = urlparse(urljoin(request.host_url, target))
-    return test_url.scheme in ('http', 'https') and ref_url.netloc == test_url.netloc
+    """
+    Accept only a path on this site: exactly one leading slash, no backslashes (browsers treat them as
+    slashes) and no control characters (browsers strip tabs and newlines, which can leave "//host").
+    """
+    if not target or not target.startswith('/') or target.startswith('//'):
+        return False
+    if '\\' in target or any(ord(char) < 32 or ord(char) == 127 for char in target):
+        return False
+    parsed = urlparse(target)
+    return not parsed.scheme and not parsed.netloc
 
 
 def retry_post(post_data):
@@ -263,7 +480,7 @@ def retry_post(post_data):
     post_url = post_data.get("url")
     post_payload = post_data.get("data")
 
-    if post_url:
+    if post_url and is_safe_url(post_url):
         # Simulate the original POST request
         with app.test_request_context(post_url, method="POST", data=post_payload):
             # Call the appropriate route function
@@ -273,12 +490,15 @@ def retry_post(post_data):
 
 
 @app.route("/login", methods=["GET", "POST"])
+@rate_limiter.limit("login", rate=5 / 60, burst=5, concurrency=HASHING_CONCURRENCY, methods=("POST",))
 def login():
     form = LogInForm()
 
-    # Use session.get() to avoid KeyError
-    previous_url = session.get('url')
-    print(f"Previous session URL: {previous_url}")
+    # Where to go after logging in, passed as ?next= (kept out of the session so anonymous pages stay cacheable)
+    next_url = request.args.get('next')
+    if next_url and not is_safe_url(next_url):
+        next_url = None
+    print(f"Next URL after login: {next_url}")
 
     if form.validate_on_submit():
         email = form.email.data
@@ -287,31 +507,30 @@ def login():
 
         if not user or not check_password_hash(user.password, password):
             flash("Invalid email or password.")
-            return redirect(url_for("login"))
+            return redirect(url_for("login", next=next_url))
 
         login_user(user)
 
         # Redirect user back to the page they tried to access before login
-        if previous_url:
-            session.pop('url')  # Remove 'url' after using it
-            return redirect(previous_url)
+        if next_url:
+            return redirect(next_url)
 
         return redirect(url_for("home"))
 
-    return render_template("login.html", form=form)
+    return render_template("login.html", form=form, next_url=next_url)
 
 
 @app.route("/<string:category>/post/<int:post_id>/like", methods=["POST"])
+@rate_limiter.limit("like", rate=0.5, burst=10, concurrency=SHARED_CONCURRENCY)
 def like_post(category, post_id):
     print(f"Like post requested: Category = {category}, Post ID = {post_id}")
 
     if not current_user.is_authenticated:
-        # If not authenticated, redirect to login page and preserve the current URL
-        return redirect(url_for('login'))
+        # If not authenticated, redirect to login page and come back to the post afterwards
+        return redirect(url_for('login', next=url_for('show_post', category=category, post_id=post_id)))
 
-    # Fetch the post
-    category = category.replace("-", " ")  # Convert hyphenated category back to spaces
-    post = Post.query.filter_by(id=post_id, category=category).first()
+    # Fetch the post (normalize_url has already turned the category into a slug)
+    post = Post.query.filter_by(id=post_id, category_slug=category).first()
 
     if not post:
         print("Post not found. Redirecting to home page.")
@@ -322,6 +541,7 @@ def like_post(category, post_id):
     # Increment likes
     post.likes += 1
     db.session.commit()
+    schedule_refreeze(post.id)
 
     print(f"Post found. Likes incremented. Current likes: {post.likes}")
 
@@ -332,7 +552,7 @@ def like_post(category, post_id):
 
     # Non-AJAX requests should redirect back to the post
     print(f"Redirecting back to post page: Category = {category}, Post ID = {post_id}")
-    return redirect(url_for('show_post', category=category.replace(" ", "-"), post_id=post_id))
+    return redirect(url_for('show_post', category=category, post_id=post_id))
 
 
 @app.route('/logout')
@@ -370,7 +590,7 @@ def send_post_notification(post):
                         <div style="margin: 20px 0;">
                             <p>Category: {post.category}</p>
                         </div>
-                        <a href="{url_for('show_post', category=post.category, post_id=post.id, _external=True)}" 
+                        <a href="{url_for('show_post', category=post.category_slug, post_id=post.id, _external=True)}" 
                            style="background-color: #007bff; color: white; padding: 10px 20px; 
                                   text-decoration: none; border-radius: 5px;">
                             Read More
@@ -398,6 +618,33 @@ def send_post_notification(post):
         return False
 
 
+def store_cover_upload(upload):
+    """Save the raw upload and return (storage key, bytes, URL to use until the derivatives are ready)."""
+    key = new_cover_key()
+    data = upload.read()
+    # Keep an extension so the interim URL is served with the image's content type
+    extension, content_type = detect_format(data) or (
+        os.path.splitext(upload.filename)[1].lstrip(".").lower() or "bin", upload.mimetype)
+    name = f"{key}/original.{extension}"
+    storage.save(name, data, content_type)
+    return key, data, storage.url(name)
+
+
+def process_cover_image(post_id, key, data):
+    """Render the card/hero/og derivatives and point the post at the hero image (runs on background_executor)."""
+    try:
+        for name, content in render_derivatives(data).items():
+            storage.save(f"{key}/{name}.jpg", content, "image/jpeg")
+    except Exception as e:
+        print(f"Error processing cover image for post {post_id}: {e}")
+        return
+
+    with app.app_context():
+        db.session.execute(db.update(Post).where(Post.id == post_id).values(img_url=storage.url(f"{key}/hero.jpg")))
+        db.session.commit()
+        notify_posts_changed(post_id)
+
+
 # noinspection PyTypeChecker
 @app.route("/new-post", methods=["GET", "POST"])
 @admin_only
@@ -405,6 +652,10 @@ def add_new_post():
     form = CreatePostForm()
 
     if form.validate_on_submit():
+        cover_key = cover_data = None
+        if form.cover_image.data:
+            cover_key, cover_data, form.img_url.data = store_cover_upload(form.cover_image.data)
+
         new_post = Post(
             title=form.title.data,
             category=form.category.data,
@@ -433,6 +684,10 @@ def add_new_post():
         db.session.add(new_post)
         db.session.commit()
 
+        notify_posts_changed(new_post.id)
+        if cover_key:
+            background_executor.submit(process_cover_image, new_post.id, cover_key, cover_data)
+
         if new_post.status == "published":
             if send_post_notification(new_post):
                 flash("New post created and notification sent to subscribers!", "success")
@@ -465,6 +720,10 @@ def edit_post(post_id):
         # Backup original status before changes
         original_status = post.status
 
+        cover_key = cover_data = None
+        if edit_form.cover_image.data:
+            cover_key, cover_data, edit_form.img_url.data = store_cover_upload(edit_form.cover_image.data)
+
         # Update post attributes
         post.title = edit_form.title.data
         post.category = edit_form.category.data
@@ -511,6 +770,9 @@ def edit_post(post_id):
 
         try:
             db.session.commit() # Commit changes to database
+            notify_posts_changed(post.id)
+            if cover_key:
+                background_executor.submit(process_cover_image, post.id, cover_key, cover_data)
             # Check if the post's status was changed to 'published' and the previous status was draft or scheduled
             if original_status != "published" and post.status == "published":
                 # Send email notification to users about the new post
@@ -523,7 +785,7 @@ def edit_post(post_id):
             print(f"Post status after commit: {post.status}")
             flash("Post updated successfully!", "success")
             # Check if there’s a saved action to replay
-            return redirect(url_for("show_post", post_id=post.id, category=post.category.replace(" ", "-")))
+            return redirect(url_for("show_post", post_id=post.id, category=post.category_slug))
         except Exception as e:
             db.session.rollback() # Rollback in case of error
             flash(f"Error updating post: {str(e)}", "danger")
@@ -553,6 +815,7 @@ def delete_post(post_id):
     post_to_delete = db.get_or_404(Post, post_id)
     db.session.delete(post_to_delete)
     db.session.commit()
+    notify_posts_changed(post_id)
     return redirect(url_for('home'))
 
 
@@ -578,6 +841,7 @@ def send_reset_email(email, reset_url):
 
 # Password Reset Routes
 @app.route("/forgot-password", methods=["GET", "POST"])
+@rate_limiter.limit("forgot_password", rate=3 / 600, burst=3, concurrency=SHARED_CONCURRENCY, methods=("POST",))
 def forgot_password():
     """
     Handle password reset request: Sends a reset email with a token
@@ -593,6 +857,9 @@ def forgot_password():
             reset_token = PasswordResetToken.query.filter_by(email=email).first()
             if reset_token:
                 reset_token.token = token # Update token if exists
+                # A reused row is a fresh link: restart its age and clear the used flag so the purge job keeps it
+                reset_token.created_at = datetime.utcnow()
+                reset_token.is_used = False
             else:
                 reset_token = PasswordResetToken(email=email, token=token)
                 db.session.add(reset_token)
@@ -614,7 +881,7 @@ def reset_password(token):
     Reset the password using the token received via email
     """
     try:
-        email = s.loads(token, salt="email-reset", max_age=3600)  # Token expires in 1 hour
+        email = s.loads(token, salt="email-reset", max_age=RESET_TOKEN_MAX_AGE)
     except SignatureExpired:
         flash("The reset link is expired! Request for another one.", "warning")
         return redirect(url_for("forgot_password"))
@@ -661,23 +928,23 @@ def about():
 def blogs(category):
     if category:
         # Filter posts by category and ensure they are published
-        posts = Post.query.filter_by(category=category.replace('-', ' '), status='published').all()
+        posts = published_posts(category)
     else:
         # Get all published posts
-        posts = Post.query.filter_by(status='published').all()
+        posts = published_posts()
     return render_template("blog.html", posts=posts, copyright_year=year)
 
 
 @app.route("/<category>")
 def show_category(category):
-    category = category.replace('-', ' ')
-    posts = Post.query.filter_by(category=category, status='published').all()
-    return render_template("category.html", posts=posts, category=category, copyright_year=year)
+    posts = published_posts(category)
+    name = posts[0]["category"] if posts else category.replace('-', ' ')
+    return render_template("category.html", posts=posts, category=name, copyright_year=year)
 
 
 @app.route("/projects")
 def projects(): # If you have a route for this
-    posts = Post.query.filter_by(category='Projects', status='published').all()
+    posts = published_posts('projects')
     return render_template("projects.html", posts=posts, copyright_year=year)
 
 
@@ -688,23 +955,24 @@ def cvresume():
 
 @app.route("/ug-escapades")
 def ugescapades():
-    posts = Post.query.filter_by(category='UG Escapades', status='published').all()
+    posts = published_posts('ug-escapades')
     return render_template("ugescapades.html", posts=posts, copyright_year=year)
 
 
 @app.route("/random-musings")
 def random_musings():
-    posts = Post.query.filter_by(category='Random Musings', status='published').all()
+    posts = published_posts('random-musings')
     return render_template("randommusings.html", posts=posts, copyright_year=year)
 
 @app.route("/türkiye-geçilmez")
 def turkiyegecilmez():
-    posts = Post.query.filter_by(category='Türkiye Geçilmez', status='published').all()
+    posts = published_posts('turkiye-gecilmez')
     return render_template("turkiyegecilmez.html", posts=posts, copyright_year=year)
 
 
 # Contact Form Route
 @app.route("/contact", methods=["GET", "POST"])
+@rate_limiter.limit("contact", rate=1 / 60, burst=3, concurrency=SHARED_CONCURRENCY, methods=("POST",))
 def contact():
     """
     Contact form for users to send messages to website owner
@@ -759,50 +1027,43 @@ def contact():
 
 @app.route("/audacious-men-series")
 def audacity():
-    posts = Post.query.filter_by(category='Audacious Men Series', status='published').all()
+    posts = published_posts('audacious-men-series')
     return render_template("audacity.html", posts=posts, copyright_year=year)
 
 
 @app.route("/my-portfolio")
 def portfolio():
-    posts = Post.query.filter_by(category='My Portfolio', status='published').all()
+    posts = published_posts('my-portfolio')
     return render_template("portfolio.html", posts=posts, copyright_year=year)
 
 
 @app.route("/<string:category>/post/<int:post_id>", methods=["GET", "POST"])
 def show_post(post_id, category=None):
-    # Fetch the post, optionally validating the category
-    if category:
-        category = category.replace("-", " ")  # Replace hyphen with space
-        print(f"[DEBUG] Searching for post with ID {post_id} in category '{category}'.")
-
-        # Use filter() with ilike() for case-insensitive comparison
-        requested_post = Post.query.filter(
-            Post.id == post_id,
-            Post.category.ilike(category)  # ilike() performs case-insensitive search
-        ).first()
-
-        if not requested_post:
-            print(f"[DEBUG] Post not found in category '{category}' with ID {post_id}. Redirecting to home.")
-            flash(f"Post with ID {post_id} not found in category {category}.", "warning")
-            return redirect(url_for("home"))
-    else:
-        requested_post = db.get_or_404(Post, post_id)
+    # Fetch the post by primary key, then check the category slug (normalize_url has slugified it)
+    requested_post = db.session.get(Post, post_id)
+    if not requested_post:
+        print(f"[DEBUG] Post with ID {post_id} not found. Redirecting to home.")
+        flash(f"Post with ID {post_id} not found.", "warning")
+        return redirect(url_for("home"))
+    if category != requested_post.category_slug:
+        # The post moved to another category since the link was made
+        return redirect(url_for("show_post", category=requested_post.category_slug, post_id=post_id), code=301)
 
 
     # Debug print to confirm image URL
     print(f"[DEBUG] Image URL before transformation: {requested_post.img_url}")
 
-    requested_post.views += 1
-    db.session.commit()
+    # Re-freezing renders the page through here too; that is not a reader
+    if not request.environ.get("frozen.bypass"):
+        requested_post.views += 1
+        db.session.commit()
 
-    # Only update session URL if it's not already the current post URL
-    if session.get('url') != request.url:
-        session['url'] = request.url
+    set_post_seo(requested_post)
 
-    comment_form = CommentForm()
+    # Building the form stores a CSRF token in the session, so anonymous readers get a login link instead
+    comment_form = CommentForm() if current_user.is_authenticated or request.method == "POST" else None
 
-    if comment_form.validate_on_submit():
+    if comment_form and comment_form.validate_on_submit():
         if current_user.is_authenticated:
 
             parent_id = request.form.get("parent_id")
@@ -814,16 +1075,27 @@ def show_post(post_id, category=None):
                 parent_id=parent_id
             )
             db.session.add(new_comment)
+            # Bump the counters in the same transaction, as UPDATE ... SET n = n + 1 so concurrent comments all count
+            db.session.execute(
+                db.update(Post).where(Post.id == requested_post.id).values(comment_count=Post.comment_count + 1)
+            )
+            if parent_id:
+                db.session.execute(
+                    db.update(Comment)
+                    .where(Comment.id == parent_id, Comment.post_id == requested_post.id)
+                    .values(reply_count=Comment.reply_count + 1)
+                )
             db.session.commit()
+            shared_cache.invalidate("posts")  # Listings show the count
+            schedule_refreeze(requested_post.id)
             return redirect(url_for('show_post', post_id=post_id, category=category))
         else:
             error = "Login Required! Please log in/Register to leave a comment"
             flash(f"{error}. Log in to leave a comment!")
-            return redirect(url_for("login", session=f"{session['url']}"))
+            return redirect(url_for("login", next=request.path))
     # Fetch all posts in the same category, excluding the current post
     top_level_comments = Comment.query.filter_by(post_id=post_id, parent_id=None).all()
-    all_posts = Post.query.filter(Post.category == requested_post.category, Post.id != requested_post.id).all()
-    categories = [cat[0] for cat in db.session.query(Post.category).distinct().all()]
+    all_posts = [p for p in published_posts(requested_post.category_slug) if p["id"] != requested_post.id]
 
     return render_template(
         "post.html",
@@ -832,13 +1104,13 @@ def show_post(post_id, category=None):
         current_user=current_user,
         form=comment_form,
         all_posts=all_posts,
-        categories=categories,
         copyright_year=year,
         category=category
     )
 
 
 @app.route('/search')
+@rate_limiter.limit("search", rate=1, burst=10, concurrency=SHARED_CONCURRENCY)
 def search():
     query = request.args.get('q')
     if query:
@@ -848,10 +1120,55 @@ def search():
     else:
         results = []
 
-    # Query all unique categories
-    categories = [cat[0] for cat in db.session.query(Post.category).distinct().all()]
+    return render_template('search.html', query=query, results=results, copyright_year=year)
+
 
-    return render_template('search.html', query=query, results=results, copyright_year=year, categories=categories)
+# Search-as-you-type over published titles and categories, kept in sync through post_change_hooks
+suggest_index = SuggestIndex()
+suggest_index_built = None  # monotonic() can be below SUGGEST_INDEX_MAX_AGE on a freshly booted host
+SUGGEST_INDEX_MAX_AGE = 300  # Full rebuilds pick up edits made in other workers
+
+
+def rebuild_suggest_index():
+    global suggest_index, suggest_index_built
+    index = SuggestIndex()
+    rows = db.session.execute(db.select(Post.id, Post.title, Post.category).where(Post.status == "published"))
+    for post_id, title, category in rows:
+        index.add_post(post_id, title, category)
+    suggest_index, suggest_index_built = index, time.monotonic()
+
+
+def update_suggest_index(post_id):
+    row = db.session.execute(
+        db.select(Post.title, Post.category).where(Post.id == post_id, Post.status == "published")
+    ).first()
+    if row:
+        suggest_index.add_post(post_id, row.title, row.category)
+    else:
+        suggest_index.remove_post(post_id)
+
+
+post_change_hooks.append(update_suggest_index)
+
+
+@app.route('/search/suggest')
+def search_suggest():
+    if suggest_index_built is None or time.monotonic() - suggest_index_built > SUGGEST_INDEX_MAX_AGE:
+        rebuild_suggest_index()
+
+    suggestions = []
+    for kind, label, ref in suggest_index.search(request.args.get('q', '')):
+        if kind == "category":
+            url = url_for('show_category', category=slugify(ref))
+        else:
+            post_id, category = ref
+            url = url_for('show_post', category=slugify(category), post_id=post_id)
+        suggestions.append({"type": kind, "label": label, "url": url})
+
+    response = jsonify({"suggestions": suggestions})
+    response.cache_control.public = True
+    response.cache_control.max_age = 60
+    return response
 
 
 @app.route("/drafts", methods=["GET", "POST"])
@@ -884,5 +1201,545 @@ def terms_and_conditions():
     return render_template("terms_conditions.html", copyright_year=year)
 
 
+# Read-only JSON API (v1): published posts, categories and comment trees
+API_POST_FIELDS = {
+    "id": Post.id,
+    "title": Post.title,
+    "date": Post.date,
+    "slug": Post.post_slug,
+    "category": Post.category,
+    "category_slug": Post.category_slug,
+    "img_url": Post.img_url,
+    "views": Post.views,
+    "likes": Post.likes,
+    "comment_count": Post.comment_count,
+    "body": Post.body,
+}
+API_DEFAULT_LIMIT = 20
+API_MAX_LIMIT = 100
+
+
+def api_error(message, status=400):
+    return jsonify({"error": message}), status
+
+
+def api_response(payload):
+    """JSON response with an ETag so pollers get a 304 when nothing changed."""
+    response = jsonify(payload)
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def encode_cursor(post_id):
+    return base64.urlsafe_b64encode(str(post_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return int(base64.urlsafe_b64decode(padded.encode()).decode())
+
+
+def api_fields():
+    """Columns selected with ?fields=title,date (id is always included); None if a name is unknown."""
+    requested = request.args.get("fields")
+    if not requested:
+        return list(API_POST_FIELDS)
+    names = ["id"] + [name.strip() for name in requested.split(",") if name.strip() and name.strip() != "id"]
+    if any(name not in API_POST_FIELDS for name in names):
+        return None
+    return names
+
+
+@app.route("/api/v1/posts")
+def api_posts():
+    """
+    Published posts, newest first, paginated with an opaque ?cursor= and ?limit=
+    """
+    names = api_fields()
+    if names is None:
+        return api_error(f"Unknown field. Available fields: {', '.join(API_POST_FIELDS)}")
+    try:
+        limit = min(int(request.args.get("limit", API_DEFAULT_LIMIT)), API_MAX_LIMIT)
+        cursor = request.args.get("cursor")
+        before_id = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        return api_error("Invalid limit or cursor.")
+    if limit < 1:
+        return api_error("Invalid limit or cursor.")
+
+    stmt = db.select(*(API_POST_FIELDS[name] for name in names)).where(Post.status == "published")
+    category = request.args.get("category")
+    if category:
+        # Accept the category name or its slug
+        stmt = stmt.where(Post.category_slug == slugify(category))
+    if before_id is not None:
+        stmt = stmt.where(Post.id < before_id)
+    # Fetch one extra row to know whether there is a next page
+    rows = db.session.execute(stmt.order_by(Post.id.desc()).limit(limit + 1)).all()
+
+    data = [dict(zip(names, row)) for row in rows[:limit]]
+    next_cursor = encode_cursor(data[-1]["id"]) if len(rows) > limit else None
+    return api_response({"data": data, "next_cursor": next_cursor})
+
+
+@app.route("/api/v1/posts/<int:post_id>")
+def api_post(post_id):
+    names = api_fields()
+    if names is None:
+        return api_error(f"Unknown field. Available fields: {', '.join(API_POST_FIELDS)}")
+    row = db.session.execute(
+        db.select(*(API_POST_FIELDS[name] for name in names)).where(Post.id == post_id, Post.status == "published")
+    ).first()
+    if row is None:
+        return api_error("Post not found.", 404)
+    return api_response({"data": dict(zip(names, row))})
+
+
+@app.route("/api/v1/categories")
+def api_categories():
+    rows = db.session.execute(
+        db.select(Post.category, Post.category_slug, db.func.count(Post.id))
+        .where(Post.status == "published")
+        .group_by(Post.category, Post.category_slug)
+        .order_by(Post.category)
+    ).all()
+    return api_response({"data": [{"name": name, "slug": slug, "post_count": count} for name, slug, count in rows]})
+
+
+@app.route("/api/v1/posts/<int:post_id>/comments")
+def api_comments(post_id):
+    """
+    Comment tree of a published post, built from one flat query
+    """
+    published = db.session.execute(
+        db.select(Post.id).where(Post.id == post_id, Post.status == "published")
+    ).first()
+    if published is None:
+        return api_error("Post not found.", 404)
+
+    rows = db.session.execute(
+        db.select(Comment.id, Comment.parent_id, Comment.text, User.name)
+        .join(User, Comment.author_id == User.id, isouter=True)
+        .where(Comment.post_id == post_id)
+        .order_by(Comment.id)
+    ).all()
+
+    nodes = {}
+    roots = []
+    for comment_id, parent_id, text, author in rows:
+        nodes[comment_id] = {"id": comment_id, "author": author, "text": text, "replies": []}
+    for comment_id, parent_id, _, _ in rows:
+        parent = nodes.get(parent_id)
+        (parent["replies"] if parent else roots).append(nodes[comment_id])
+    return api_response({"data": roots})
+
+
+@app.route("/admin/rate-limits")
+@admin_only
+def rate_limit_stats():
+    """
+    Requests rejected by the rate limiter in this worker since it started
+    """
+    return jsonify(dict(rate_limiter.rejections))
+
+
+@app.route("/admin/profiles")
+@admin_only
+def profile_reports():
+    """
+    Saved request profiles, newest first
+    """
+    return jsonify([
+        {"name": name,
+         "report": url_for('profile_report', filename=f"{name}.txt"),
+         "pstats": url_for('profile_report', filename=f"{name}.prof")}
+        for name in profiler.reports()
+    ])
+
+
+@app.route("/admin/profiles/<path:filename>")
+@admin_only
+def profile_report(filename):
+    """
+    A saved profile: the .txt report inline, or the .prof file as a download for pstats/snakeviz
+    """
+    if filename.endswith('.txt'):
+        return send_from_directory(profiler.report_dir, filename, mimetype='text/plain')
+    return send_from_directory(profiler.report_dir, filename, as_attachment=True)
+
+
+# Content export/import: posts, comments and users as NDJSON (one record per line)
+TRANSFER_MODELS = {"user": User, "post": Post, "comment": Comment}  # Exported in this order
+TRANSFER_NATURAL_KEYS = {"user": "email", "post": "title"}  # Existing rows are reused instead of duplicated
+TRANSFER_FOREIGN_KEYS = {
+    "post": {"author_id": "user"},
+    "comment": {"author_id": "user", "post_id": "post", "parent_id": "comment"},
+}
+TRANSFER_BATCH_SIZE = 1000
+
+
+def export_records():
+    """
+    Yield every user, post and comment as an NDJSON line, streaming column tuples from a server-side cursor
+    """
+    for kind, model in TRANSFER_MODELS.items():
+        columns = list(model.__table__.columns)
+        rows = db.session.execute(
+            db.select(*columns).order_by(model.id).execution_options(yield_per=TRANSFER_BATCH_SIZE)
+        )
+        for row in rows:
+            record = {"type": kind}
+            for column, value in zip(columns, row):
+                record[column.name] = value.isoformat() if isinstance(value, datetime) else value
+            yield json.dumps(record) + "\n"
+
+
+def _import_batch(kind, records, id_maps, orphans, reused):
+    """
+    Insert one batch of records of the same type and remember their new ids. Comments on posts that
+    already existed are skipped: those came from an earlier import (or this is the source database).
+    """
+    model = TRANSFER_MODELS[kind]
+    table_columns = model.__table__.columns
+    key = TRANSFER_NATURAL_KEYS.get(kind)
+    existing = {}
+    if key:
+        column = getattr(model, key)
+        wanted = [record.get(key) for record in records]
+        existing = dict(db.session.execute(db.select(column, model.id).where(column.in_(wanted))).all())
+
+    rows, old_ids = [], []
+    for record in records:
+        old_id = record.pop("id")
+        if key and record.get(key) in existing:
+            id_maps[kind][old_id] = existing[record[key]]
+            reused[kind].add(existing[record[key]])
+            continue
+        if kind == "comment" and id_maps["post"].get(record.get("post_id")) in reused["post"]:
+            reused["comment"].add(old_id)
+            continue
+
+        row = {}
+        for name, value in record.items():
+            if name not in table_columns:
+                continue  # Column dropped since the export was taken
+            if value is not None and isinstance(table_columns[name].type, db.DateTime):
+                value = datetime.fromisoformat(value)
+            row[name] = value
+
+        if kind == "post":
+            # Bulk inserts skip the model validators, and older exports have no slug columns
+            row["category_slug"] = slugify(row["category"])
+            row["post_slug"] = slugify(row["title"])
+
+        for name, target in TRANSFER_FOREIGN_KEYS.get(kind, {}).items():
+            old_ref = row.get(name)
+            if old_ref is None:
+                continue
+            row[name] = id_maps[target].get(old_ref)
+            if row[name] is None and target == kind:
+                orphans.append((old_id, old_ref))  # Parent is in this batch, link it up afterwards
+
+        rows.append(row)
+        old_ids.append(old_id)
+
+    if rows:
+        new_ids = db.session.scalars(
+            db.insert(model).returning(model.id, sort_by_parameter_order=True), rows
+        ).all()
+        id_maps[kind].update(zip(old_ids, new_ids))
+    db.session.commit()
+    return len(rows)
+
+
+def import_records(lines, batch_size=TRANSFER_BATCH_SIZE):
+    """
+    Bulk insert exported records in batched transactions, remapping ids to the target database
+    """
+    id_maps = {kind: {} for kind in TRANSFER_MODELS}
+    reused = {kind: set() for kind in TRANSFER_MODELS}  # Target ids matched by natural key; old ids of skipped comments
+    orphans = []
+    counts = dict.fromkeys(TRANSFER_MODELS, 0)
+    batch, batch_kind = [], None
+
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        kind = record.pop("type")
+        if kind not in TRANSFER_MODELS:
+            raise ValueError(f"Unknown record type: {kind}")
+        if batch and (kind != batch_kind or len(batch) >= batch_size):
+            counts[batch_kind] += _import_batch(batch_kind, batch, id_maps, orphans, reused)
+            batch = []
+        batch.append(record)
+        batch_kind = kind
+    if batch:
+        counts[batch_kind] += _import_batch(batch_kind, batch, id_maps, orphans, reused)
+
+    comment_ids = id_maps["comment"]
+    links = [{"id": comment_ids[old_id], "parent_id": comment_ids.get(old_parent)} for old_id, old_parent in orphans]
+    for start in range(0, len(links), batch_size):
+        db.session.execute(db.update(Comment), links[start:start + batch_size])
+        db.session.commit()
+
+    if reused["comment"]:
+        print(f"Skipped {len(reused['comment'])} comments on posts that were already in the database")
+    # Older exports carry no counters
+    reconcile_comment_counts()
+    return counts
+
+
+@app.route("/admin/export")
+@admin_only
+def export_content():
+    """
+    Download all posts, comments and users as NDJSON
+    """
+    response = Response(stream_with_context(export_records()), mimetype="application/x-ndjson")
+    response.headers["Content-Disposition"] = f"attachment; filename=alhadar-{date.today().isoformat()}.ndjson"
+    return response
+
+
+@app.cli.command("export-content")
+@click.argument("output", type=click.File("w", encoding="utf-8"), default="-")
+def export_content_command(output):
+    """Write all posts, comments and users to OUTPUT as NDJSON."""
+    for line in export_records():
+        output.write(line)
+
+
+@app.cli.command("import-content")
+@click.argument("source", type=click.File("r", encoding="utf-8"))
+@click.option("--batch-size", default=TRANSFER_BATCH_SIZE, show_default=True)
+def import_content_command(source, batch_size):
+    """Load an NDJSON export from SOURCE into the configured database."""
+    counts = import_records(source, batch_size=batch_size)
+    click.echo(", ".join(f"{count} {kind}s" for kind, count in counts.items()) + " imported")
+
+
+# Maintenance jobs: `flask maintenance` runs every registered job once, --interval keeps it running
+MAINTENANCE_JOBS = {}
+MAINTENANCE_BATCH_SIZE = 500
+
+
+def maintenance_job(name):
+    """Register a function returning the number of rows it touched."""
+    def register(func):
+        MAINTENANCE_JOBS[name] = func
+        return func
+    return register
+
+
+def delete_in_batches(model, *criteria, batch_size=MAINTENANCE_BATCH_SIZE):
+    """Delete matching rows a batch at a time, committing in between so locks stay short."""
+    deleted = 0
+    while True:
+        ids = db.session.scalars(db.select(model.id).where(*criteria).limit(batch_size)).all()
+        if not ids:
+            return deleted
+        db.session.execute(db.delete(model).where(model.id.in_(ids)))
+        db.session.commit()
+        deleted += len(ids)
+
+
+@maintenance_job("purge-reset-tokens")
+def purge_reset_tokens():
+    expired = datetime.utcnow() - timedelta(seconds=RESET_TOKEN_MAX_AGE)
+    return delete_in_batches(
+        PasswordResetToken,
+        db.or_(PasswordResetToken.is_used.is_(True), PasswordResetToken.created_at < expired),
+    )
+
+
+def reconcile_counter(counter, counted):
+    """
+    Compare counter (a count column of the model) with the number of comments grouped by counted, and
+    recount the rows that drifted; the fix is a correlated subquery, so comments added meanwhile count too.
+    """
+    model = counter.class_
+    actual = dict(db.session.execute(
+        db.select(counted, db.func.count()).where(counted.is_not(None)).group_by(counted)
+    ).all())
+    drifted = [row_id for row_id, stored in db.session.execute(db.select(model.id, counter))
+               if stored != actual.get(row_id, 0)]
+
+    counting = aliased(Comment)
+    recount = db.select(db.func.count(counting.id)).where(getattr(counting, counted.key) == model.id)
+    for start in range(0, len(drifted), MAINTENANCE_BATCH_SIZE):
+        batch = drifted[start:start + MAINTENANCE_BATCH_SIZE]
+        db.session.execute(
+            db.update(model).where(model.id.in_(batch)).values({counter: recount.scalar_subquery()}),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.commit()
+    return len(drifted)
+
+
+@maintenance_job("reconcile-comment-counts")
+def reconcile_comment_counts():
+    return (reconcile_counter(Post.comment_count, Comment.post_id)
+            + reconcile_counter(Comment.reply_count, Comment.parent_id))
+
+
+@maintenance_job("vacuum-analyze")
+def vacuum_analyze():
+    tables = [model.__tablename__ for model in (Post, User, Comment, PasswordResetToken)]
+    # VACUUM refuses to run inside a transaction
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if connection.dialect.name == "postgresql":
+            for table in tables:
+                connection.exec_driver_sql(f"VACUUM (ANALYZE) {table}")
+        else:
+            connection.exec_driver_sql("ANALYZE")
+    return 0
+
+
+def run_maintenance(names=None):
+    """
+    Run the selected (default: all) maintenance jobs and report rows touched and timing for each
+    """
+    results = {}
+    for name, job in MAINTENANCE_JOBS.items():
+        if names and name not in names:
+            continue
+        started = time.perf_counter()
+        try:
+            rows = job()
+        except Exception as e:
+            db.session.rollback()
+            print(f"[maintenance] {name} failed: {e}")
+            continue
+        elapsed = time.perf_counter() - started
+        print(f"[maintenance] {name}: {rows} rows in {elapsed:.2f}s")
+        results[name] = (rows, elapsed)
+    return results
+
+
+@app.cli.command("maintenance")
+@click.option("--job", "jobs", multiple=True, type=click.Choice(list(MAINTENANCE_JOBS)), help="Run only this job.")
+@click.option("--interval", type=int, default=0, help="Repeat every INTERVAL seconds instead of running once.")
+def maintenance_command(jobs, interval):
+    """Purge stale password reset tokens, reconcile comment counters and refresh planner statistics."""
+    while True:
+        run_maintenance(jobs)
+        if not interval:
+            break
+        time.sleep(interval)
+
+
+# Static export ("freeze") of content-only pages and, with FREEZE_PAGES=all, published posts
+FROZEN_ENDPOINTS = ["home", "about", "cvresume", "disclaimer", "privacy_policy", "terms_and_conditions"]
+
+
+def frozen_post_path(post_id, category_slug):
+    return unquote(url_for('show_post', category=category_slug, post_id=post_id))
+
+
+def render_frozen(path):
+    """Render one page through the app (bypassing the frozen copy) and store it; returns True on success."""
+    response = app.test_client().get(path, base_url=SITE_URL, environ_overrides={"frozen.bypass": True})
+    try:
+        if response.status_code != 200:
+            frozen_pages.remove(path)
+            return False
+        frozen_pages.write(path, response.get_data())
+    except OSError as e:
+        # Another worker may be rebuilding the same directory at boot
+        print(f"Could not freeze {path}: {e}")
+        return False
+    return True
+
+
+def freeze_site(include_posts=False):
+    """
+    Pre-render every frozen page from scratch and enable the fast path
+    """
+    with app.test_request_context(base_url=SITE_URL):
+        paths = [url_for(endpoint) for endpoint in FROZEN_ENDPOINTS]
+        if include_posts:
+            rows = db.session.execute(db.select(Post.id, Post.category_slug).where(Post.status == "published"))
+            paths += [frozen_post_path(post_id, category) for post_id, category in rows]
+
+    frozen_pages.enabled = False
+    frozen_pages.clear()
+    count = sum(render_frozen(path) for path in paths)
+    frozen_pages.write_manifest({
+        "templates": templates_fingerprint(os.path.join(app.root_path, app.template_folder)),
+        "posts": include_posts,
+    })
+    frozen_pages.enabled = True
+    return count
+
+
+def refreeze_post(post_id):
+    """Drop a post's frozen copies (its category may have changed) and re-render it if still published."""
+    for path in glob.glob(os.path.join(glob.escape(frozen_pages.root), "*", "post", str(post_id), "index.html")):
+        os.remove(path)
+    with app.app_context():
+        row = db.session.execute(
+            db.select(Post.category_slug).where(Post.id == post_id, Post.status == "published")
+        ).first()
+    if row:
+        with app.test_request_context(base_url=SITE_URL):
+            path = frozen_post_path(post_id, row.category_slug)
+        render_frozen(path)
+
+
+def schedule_refreeze(post_id):
+    """Refresh a frozen post in the background after it, its comments or its likes change."""
+    if FREEZE_MODE == "all":
+        background_executor.submit(refreeze_post, post_id)
+
+
+post_change_hooks.append(schedule_refreeze)
+
+
+@app.cli.command("freeze")
+@click.option("--posts/--no-posts", default=None, help="Also freeze published posts (default: FREEZE_PAGES=all).")
+def freeze_command(posts):
+    """Pre-render content-only pages to static HTML."""
+    include_posts = FREEZE_MODE == "all" if posts is None else posts
+    click.echo(f"{freeze_site(include_posts)} pages written to {frozen_pages.root}")
+
+
+# Gunicorn preload support (hooks live in gunicorn.conf.py)
+def warm_up():
+    """
+    Compile every template in the master so preloaded workers share them copy-on-write
+    """
+    for name in app.jinja_env.list_templates():
+        try:
+            app.jinja_env.get_template(name)
+        except TemplateError as e:
+            print(f"Skipping template {name} during warm up: {e}")
+
+
+def reset_after_fork():
+    """
+    Drop the database, cache, rate limiter and Supabase connections inherited from the gunicorn master
+    """
+    global supabase
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False leaves the master's sockets alone; the worker builds a fresh pool on first use
+            engine.dispose(close=False)
+    # The boot-time freeze opens the cache (SQLite file or Redis socket) on the master's thread
+    for store in (shared_cache.backend, rate_limit_buckets):
+        if hasattr(store, "reset"):
+            store.reset()
+    supabase = create_client(supabase_url, supabase_key)
+
+
+# Rebuild frozen pages at boot when the templates changed since they were rendered
+if FREEZE_MODE != "off":
+    with app.app_context():
+        manifest = frozen_pages.manifest()
+        if (manifest.get("templates") != templates_fingerprint(os.path.join(app.root_path, app.template_folder))
+                or manifest.get("posts") != (FREEZE_MODE == "all")):
+            freeze_site(include_posts=FREEZE_MODE == "all")
+        frozen_pages.enabled = True
+
+
 if __name__ == "__main__":
     app.run(debug=True, port=5005)
@@ -0,0 +1,337 @@
+# Cache with interchangeable backends: in-process LRU, a SQLite file shared by the workers on a host,
+# or anything that speaks the Redis protocol
+import os
+import pickle
+import random
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+
+class LRUBackend:
+    """Values kept in this process, evicting the least recently used past `max_entries`."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires, value)
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[0] is not None and entry[0] <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = entry[1]
+        return found
+
+    def set_many(self, mapping, ttl):
+        expires = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            for key, value in mapping.items():
+                self._entries[key] = (expires, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def incr(self, key):
+        with self._lock:
+            expires, value = self._entries.get(key, (None, 0))
+            self._entries[key] = (expires, value + 1)
+            return value + 1
+
+    def counter(self, key):
+        return self.get_many([key]).get(key, 0)
+
+
+class SQLiteBackend:
+    """Pickled values in a memory-mapped SQLite file, shared by every worker on the host."""
+
+    def __init__(self, path, max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        connection = self._connect()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, expires REAL)")
+        connection.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)")
+        connection.close()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+        connection.execute("PRAGMA mmap_size=67108864")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _connection(self):
+        # One connection per thread, opened lazily so nothing is inherited across fork
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    def reset(self):
+        """Forget connections inherited across fork, so every thread of the child opens its own."""
+        self._local = threading.local()
+
+    def _failed(self, connection, error):
+        """Roll back whatever the failed call left open, so the thread's next BEGIN works; a miss either way."""
+        print(f"Cache unavailable: {error}")
+        try:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+        except sqlite3.Error:
+            connection.close()
+            self._local.connection = None
+
+    def get_many(self, keys):
+        keys = list(keys)
+        if not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        connection = self._connection()
+        try:
+            rows = connection.execute(
+                f"SELECT key, value FROM cache WHERE key IN ({placeholders}) AND (expires IS NULL OR expires > ?)",
+                (*keys, time.time()),
+            ).fetchall()
+        except sqlite3.Error as e:
+            self._failed(connection, e)
+            return {}
+        return {key: pickle.loads(value) for key, value in rows}
+
+    def set_many(self, mapping, ttl):
+        expires = time.time() + ttl if ttl else None
+        # Pickle before taking the write lock, so nothing but SQLite can fail inside the transaction
+        rows = [(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires) for key, value in mapping.items()]
+        connection = self._connection()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany("INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)", rows)
+            connection.execute("COMMIT")
+            if random.random() < 0.01:
+                self._prune(connection)
+        except sqlite3.Error as e:
+            self._failed(connection, e)
+
+    def _prune(self, connection):
+        """Drop expired rows, then the entries closest to expiry while over max_entries."""
+        connection.execute("DELETE FROM cache WHERE expires <= ?", (time.time(),))
+        connection.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache WHERE expires IS NOT NULL "
+            "ORDER BY expires LIMIT max(0, (SELECT count(*) FROM cache) - ?))",
+            (self.max_entries,),
+        )
+
+    def delete_many(self, keys):
+        connection = self._connection()
+        try:
+            connection.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key in keys])
+        except sqlite3.Error as e:
+            self._failed(connection, e)
+
+    def incr(self, key):
+        connection = self._connection()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+            value = (pickle.loads(row[0]) if row else 0) + 1
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, NULL)",
+                (key, pickle.dumps(value)),
+            )
+            connection.execute("COMMIT")
+        except sqlite3.Error as e:
+            self._failed(connection, e)
+            return None
+        return value
+
+    def counter(self, key):
+        # get_many already treats errors as a miss
+        return self.get_many([key]).get(key, 0)
+
+
+class RedisBackend:
+    """
+    Minimal Redis protocol (RESP) client, enough for GET/SET/DEL/INCR. Works against Redis, Valkey
+    or any local stand-in that speaks the protocol. Connection errors and error replies (-NOAUTH,
+    -OOM, ...) count as cache misses.
+    """
+
+    # What a failed command can raise: socket errors, "-ERR" replies and garbled replies
+    ERRORS = (OSError, RuntimeError, ValueError)
+
+    def __init__(self, url):
+        parsed = urlparse(url)
+        self.address = (parsed.hostname or "localhost", parsed.port or 6379)
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            sock = socket.create_connection(self.address, timeout=0.5)
+            connection = self._local.connection = (sock, sock.makefile("rb"))
+            if self.password:
+                self._execute([("AUTH", self.password)])
+            if self.db:
+                self._execute([("SELECT", self.db)])
+        return connection
+
+    def reset(self):
+        """Forget the socket inherited across fork; sharing it with the parent would interleave replies."""
+        self._local = threading.local()
+
+    @staticmethod
+    def _encode(args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def _read_reply(self, reader):
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload
+        if prefix == b"-":
+            raise RuntimeError(payload.decode())
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            return None if length < 0 else reader.read(length + 2)[:-2]
+        if prefix == b"*":
+            length = int(payload)
+            return None if length < 0 else [self._read_reply(reader) for _ in range(length)]
+        raise RuntimeError(f"Unexpected reply: {line!r}")
+
+    def _execute(self, commands):
+        """Send every command in one write (pipelining) and return their replies."""
+        sock, reader = self._connection()
+        try:
+            sock.sendall(b"".join(self._encode(command) for command in commands))
+            return [self._read_reply(reader) for _ in commands]
+        except self.ERRORS:
+            # Replies to the rest of the pipeline may still be unread; start over on a new connection
+            self._local.connection = None
+            sock.close()
+            raise
+
+    def get_many(self, keys):
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            values = self._execute([("MGET", *keys)])[0]
+        except self.ERRORS as e:
+            print(f"Cache unavailable: {e}")
+            return {}
+        return {key: pickle.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, mapping, ttl):
+        commands = []
+        for key, value in mapping.items():
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            commands.append(("SET", key, data, "EX", int(ttl)) if ttl else ("SET", key, data))
+        try:
+            self._execute(commands)
+        except self.ERRORS as e:
+            print(f"Cache unavailable: {e}")
+
+    def delete_many(self, keys):
+        try:
+            self._execute([("DEL", *keys)])
+        except self.ERRORS as e:
+            print(f"Cache unavailable: {e}")
+
+    def incr(self, key):
+        try:
+            return self._execute([("INCR", key)])[0]
+        except self.ERRORS as e:
+            print(f"Cache unavailable: {e}")
+
+    def counter(self, key):
+        # INCR stores a plain integer rather than a pickle
+        try:
+            value = self._execute([("GET", key)])[0]
+        except self.ERRORS as e:
+            print(f"Cache unavailable: {e}")
+            return 0
+        return int(value) if value is not None else 0
+
+
+class Cache:
+    """
+    Namespaced keys grouped for invalidation: invalidate("posts") bumps the group's version, so
+    every key written under the old version is simply never read again and ages out.
+    """
+
+    def __init__(self, backend, namespace="alhadar"):
+        self.backend = backend
+        self.namespace = namespace
+
+    def _version(self, group):
+        return self.backend.counter(f"{self.namespace}:{group}:version")
+
+    def _key(self, group, version, key):
+        return f"{self.namespace}:{group}:{version}:{key}"
+
+    def get_many(self, group, keys):
+        version = self._version(group)
+        full_keys = {self._key(group, version, key): key for key in keys}
+        return {full_keys[full_key]: value for full_key, value in self.backend.get_many(full_keys).items()}
+
+    def set_many(self, group, mapping, ttl=300):
+        version = self._version(group)
+        self.backend.set_many({self._key(group, version, key): value for key, value in mapping.items()}, ttl)
+
+    def get(self, group, key, default=None):
+        return self.get_many(group, [key]).get(key, default)
+
+    def set(self, group, key, value, ttl=300):
+        self.set_many(group, {key: value}, ttl)
+
+    def get_or_set(self, group, key, ttl, compute):
+        version = self._version(group)
+        full_key = self._key(group, version, key)
+        found = self.backend.get_many([full_key])
+        if full_key in found:
+            return found[full_key]
+        value = compute()
+        self.backend.set_many({full_key: value}, ttl)
+        return value
+
+    def invalidate(self, group):
+        self.backend.incr(f"{self.namespace}:{group}:version")
+
+
+def create_cache(backend, url=None, namespace="alhadar"):
+    """Build a Cache for CACHE_BACKEND-style names: "memory", "sqlite" (url is a path) or "redis"."""
+    if backend == "memory":
+        return Cache(LRUBackend(), namespace)
+    if backend == "sqlite":
+        return Cache(SQLiteBackend(url), namespace)
+    if backend == "redis":
+        return Cache(RedisBackend(url or "redis://localhost:6379/0"), namespace)
+    raise ValueError(f"Unknown cache backend: {backend}")
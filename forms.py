@@ -1,5 +1,6 @@
 # Import required libraries
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileAllowed
 from wtforms import StringField, SubmitField, PasswordField, EmailField, DateField, TimeField
 from wtforms.validators import DataRequired, EqualTo, Email, Length, Regexp, Optional
 from flask_ckeditor import CKEditorField
@@ -8,7 +9,10 @@ from flask_ckeditor import CKEditorField
 # Form to submit a post
 class CreatePostForm(FlaskForm):
     title = StringField("Blog Post Title", validators=[DataRequired()])
-    img_url = StringField("Image URL", validators=[DataRequired()])
+    img_url = StringField("Image URL", validators=[Optional()])
+    cover_image = FileField("Or Upload a Cover Image", validators=[
+        FileAllowed(['jpg', 'jpeg', 'png', 'webp'], 'Images only (jpg, png or webp).')
+    ])
     body = CKEditorField("Blog Content", validators=[DataRequired()])
     category = StringField("Category", validators=[DataRequired()])
 
@@ -27,6 +31,10 @@ class CreatePostForm(FlaskForm):
         if not initial_validation:
             return False
 
+        if not self.img_url.data and not self.cover_image.data:
+            self.img_url.errors = ['Enter an image URL or upload a cover image.']
+            return False
+
         if self.schedule.data:
             if not self.publish_date.data:
                 self.publish_date.errors = ['Publish date is required when scheduling a post.']
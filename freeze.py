@@ -0,0 +1,113 @@
+# Pre-rendered ("frozen") HTML pages served ahead of the Flask dispatcher
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from email.utils import formatdate
+from werkzeug.http import parse_cookie
+
+MANIFEST = "manifest.json"
+
+
+def templates_fingerprint(template_folder):
+    """Hash of every template source, so frozen pages can be rebuilt after a template change."""
+    digest = hashlib.sha1()
+    for dirpath, dirnames, filenames in os.walk(template_folder):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            digest.update(os.path.relpath(path, template_folder).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+class FrozenPages:
+    """
+    WSGI middleware that answers anonymous GET/HEAD requests from ROOT/<path>/index.html when the
+    file exists, and hands everything else (query strings, session cookies, missing files) to the app.
+    """
+
+    def __init__(self, wsgi_app, root, session_cookies, max_age=300):
+        self.wsgi_app = wsgi_app
+        self.root = root
+        self.session_cookies = set(session_cookies)
+        self.max_age = max_age
+        self.enabled = False  # Switched on once the pages match the current templates
+
+    def file_for(self, url_path):
+        parts = [part for part in url_path.split("/") if part]
+        if any(part in (".", "..") or "\\" in part for part in parts):
+            return None
+        # Only the exact URL Flask routes: it 404s "/about/" and redirects "//about"
+        if url_path != "/" + "/".join(parts):
+            return None
+        return os.path.join(self.root, *parts, "index.html")
+
+    def write(self, url_path, html):
+        path = self.file_for(url_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write beside the target and rename, so a request never sees a half-written page
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(html)
+        os.replace(tmp_path, path)
+
+    def remove(self, url_path):
+        path = self.file_for(url_path)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def manifest(self):
+        try:
+            with open(os.path.join(self.root, MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def write_manifest(self, manifest):
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, MANIFEST), "w") as f:
+            json.dump(manifest, f)
+
+    def __call__(self, environ, start_response):
+        if (self.enabled
+                and environ["REQUEST_METHOD"] in ("GET", "HEAD")
+                and not environ.get("QUERY_STRING")
+                and not environ.get("frozen.bypass")
+                and not self.session_cookies & parse_cookie(environ).keys()):
+            # WSGI hands the path over as latin-1; the files are named after the UTF-8 URL
+            url_path = environ.get("PATH_INFO", "/").encode("latin-1").decode("utf-8", "replace")
+            path = self.file_for(url_path)
+            if path:
+                try:
+                    with open(path, "rb") as f:
+                        body = f.read()
+                        mtime = os.fstat(f.fileno()).st_mtime
+                except OSError:
+                    pass
+                else:
+                    return self.serve(environ, start_response, body, mtime)
+        return self.wsgi_app(environ, start_response)
+
+    def serve(self, environ, start_response, body, mtime):
+        etag = f'"{int(mtime)}-{len(body)}"'
+        headers = [
+            ("Content-Type", "text/html; charset=utf-8"),
+            ("Cache-Control", f"public, max-age={self.max_age}"),
+            # Requests with a session cookie get the (private) Flask page at the same URL
+            ("Vary", "Cookie"),
+            ("ETag", etag),
+            ("Last-Modified", formatdate(mtime, usegmt=True)),
+        ]
+        # Compare weakly: CompressionMiddleware hands the client a W/ copy of this ETag
+        if environ.get("HTTP_IF_NONE_MATCH", "").removeprefix("W/") == etag:
+            start_response("304 Not Modified", headers)
+            return [b""]
+        headers.append(("Content-Length", str(len(body))))
+        start_response("200 OK", headers)
+        return [b""] if environ["REQUEST_METHOD"] == "HEAD" else [body]
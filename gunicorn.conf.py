@@ -0,0 +1,34 @@
+# Gunicorn configuration (picked up automatically from the working directory)
+import gc
+import os
+
+# Render sets WEB_CONCURRENCY to match the instance size
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+
+# Threads let one worker overlap DB, SMTP and hCaptcha round trips
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Load the app once in the master and fork workers from it (set GUNICORN_PRELOAD=0 to disable)
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') == '1'
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+
+
+def when_ready(server):
+    """Build shared state in the master before the first worker is forked."""
+    if not server.cfg.preload_app:
+        return
+    from app import warm_up
+    warm_up()
+    # Move everything allocated so far out of the GC's reach so collections in the
+    # workers don't touch (and un-share) the master's pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Give each worker its own connections instead of the ones inherited from the master."""
+    if not server.cfg.preload_app:
+        return
+    from app import reset_after_fork
+    reset_after_fork()
@@ -0,0 +1,52 @@
+# Cover image derivatives rendered with Pillow
+import io
+import re
+import uuid
+from PIL import Image, ImageOps
+
+# Derivative name -> (width, height); every derivative is center-cropped to fill its box
+COVER_SIZES = {
+    "card": (600, 400),   # Listings and search results
+    "hero": (1600, 900),  # Post masthead
+    "og": (1200, 630),    # Open Graph / social previews
+}
+
+# Matches ingested covers whatever the storage backend, e.g. .../covers/<key>/hero.jpg
+COVER_URL = re.compile(r"(/covers/[0-9a-f]{32}/)(card|hero|og)\.jpg(?=$|\?)")
+
+
+def new_cover_key():
+    return f"covers/{uuid.uuid4().hex}"
+
+
+def detect_format(data):
+    """(extension, content type) of an uploaded image as Pillow reads it, or None if it can't."""
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            fmt = image.format
+    except (OSError, ValueError):
+        return None
+    return ("jpg" if fmt == "JPEG" else fmt.lower()), Image.MIME.get(fmt, "application/octet-stream")
+
+
+def render_derivatives(data):
+    """Return {name: JPEG bytes} for every size in COVER_SIZES."""
+    with Image.open(io.BytesIO(data)) as image:
+        # Let the JPEG decoder downscale while decoding when the source is much larger than needed
+        image.draft("RGB", max(COVER_SIZES.values()))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        derivatives = {}
+        for name, size in COVER_SIZES.items():
+            buffer = io.BytesIO()
+            ImageOps.fit(image, size, Image.Resampling.LANCZOS).save(
+                buffer, "JPEG", quality=82, optimize=True, progressive=True
+            )
+            derivatives[name] = buffer.getvalue()
+    return derivatives
+
+
+def cover_variant(url, size):
+    """URL of another derivative of an ingested cover; external URLs are returned unchanged."""
+    if not url:
+        return url
+    return COVER_URL.sub(lambda match: f"{match.group(1)}{size}.jpg", url, count=1)
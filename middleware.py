@@ -1,5 +1,15 @@
 from flask import request, g, url_for
 from urllib.parse import urljoin
+from images import cover_variant
+from werkzeug.http import parse_accept_header
+from werkzeug.wsgi import ClosingIterator
+from itertools import chain
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip is offered
+    brotli = None
 
 
 class SEOMiddleware:
@@ -23,25 +33,152 @@ class SEOMiddleware:
         # Google Tag Manager ID
         g.gtm_id = "YOUR GOOGLE TAG ID"
 
-        # Customize SEO metadata for specific pages
-        if request.endpoint == "show_post":
-            post = getattr(request.view_args, 'post', None)
-            if post:
-                g.seo["title"] = post.title
-                g.seo["description"] = (post.body[:160] + "...") if post.body else "Check out this post."
-                g.seo["image"] = post.img_url
-                g.seo["url"] = urljoin(request.host_url,
-                                       url_for('show_post', category=post.category.replace(" ", "-"), post_id=post.id))
-
-                # Ensure canonical URL is in lowercase
-                g.seo["canonical"] = urljoin(request.host_url,
-                                             url_for('show_post', category=post.category.replace(" ", "-").lower(),
-                                                     post_id=post.id))
-
-        elif request.endpoint == "about":
+        # Customize SEO metadata for specific pages (posts are handled by set_post_seo)
+        if request.endpoint == "about":
             g.seo["title"] = "About - Al Hadar Mumuni"
             g.seo["description"] = "Learn more about Al Hadar Mumuni."
 
         elif request.endpoint == "contact":
             g.seo["title"] = "Contact - Al Hadar Mumuni"
             g.seo["description"] = "Get in touch with Al Hadar Mumuni."
+
+
+def set_post_seo(post):
+    """Override the default SEO metadata once a view has loaded its post."""
+    g.seo["title"] = post.title
+    g.seo["description"] = (post.body[:160] + "...") if post.body else "Check out this post."
+    g.seo["image"] = urljoin(request.host_url, cover_variant(post.img_url, "og"))
+    g.seo["url"] = urljoin(request.host_url, url_for('show_post', category=post.category_slug, post_id=post.id))
+    g.seo["canonical"] = g.seo["url"]
+
+
+class CompressionMiddleware:
+    """
+    WSGI middleware that gzip/brotli-compresses text responses the client accepts. Responses with a
+    Content-Length are compressed in one go; streamed ones (no Content-Length) chunk by chunk.
+    """
+
+    COMPRESSIBLE_TYPES = (
+        "text/", "application/json", "application/xml", "application/javascript",
+        "application/x-ndjson", "image/svg+xml",
+    )
+
+    def __init__(self, app, min_size=500, level=6, brotli_quality=4, stream_buffer=32768):
+        self.app = app
+        self.min_size = min_size
+        self.stream_buffer = stream_buffer
+        self.level = level
+        self.brotli_quality = brotli_quality
+        self.encodings = ["br", "gzip"] if brotli else ["gzip"]
+
+    def __call__(self, environ, start_response):
+        captured = []
+
+        def capture(status, headers, exc_info=None):
+            captured[:] = [status, headers, exc_info]
+
+        # Flask calls start_response before handing back the body; a generator app only once iterated
+        app_iter = self.app(environ, capture)
+        chunks, first = iter(app_iter), []
+        try:
+            while not captured:
+                first.append(next(chunks))
+        except StopIteration:
+            if not captured:
+                self.close(app_iter)
+                raise RuntimeError("WSGI app returned without calling start_response")
+        except BaseException:
+            self.close(app_iter)
+            raise
+        if first:
+            # Hand back what was pulled, still closing the app's own iterable when the server is done
+            app_iter = ClosingIterator(chain(first, chunks), getattr(app_iter, "close", None))
+            chunks = iter(app_iter)
+        status, headers, exc_info = captured
+        header_names = {name.lower(): value for name, value in headers}
+
+        content_type = header_names.get("content-type", "")
+        if not content_type.startswith(self.COMPRESSIBLE_TYPES):
+            start_response(status, headers, exc_info)
+            return app_iter
+
+        # The body depends on Accept-Encoding from here on, so shared caches must key on it
+        headers = self.add_vary(headers)
+        encoding = parse_accept_header(environ.get("HTTP_ACCEPT_ENCODING", "")).best_match(self.encodings)
+        content_length = header_names.get("content-length")
+        if (encoding is None
+                or environ["REQUEST_METHOD"] == "HEAD"
+                or status[:3] in ("204", "206", "304")
+                or "content-encoding" in header_names
+                or "no-transform" in header_names.get("cache-control", "")
+                or (content_length is not None and int(content_length) < self.min_size)):
+            start_response(status, headers, exc_info)
+            return app_iter
+
+        headers = [(name, self.weaken_etag(value) if name.lower() == "etag" else value)
+                   for name, value in headers if name.lower() != "content-length"]
+        headers.append(("Content-Encoding", encoding))
+
+        if content_length is None:
+            start_response(status, headers, exc_info)
+            # A real close(), so the app's iterable is closed even if the server never starts iterating
+            return ClosingIterator(self.stream(chunks, encoding), getattr(app_iter, "close", None))
+
+        try:
+            body = b"".join(chunks)
+        finally:
+            self.close(app_iter)
+        compressed = self.compress(body, encoding)
+        headers.append(("Content-Length", str(len(compressed))))
+        start_response(status, headers, exc_info)
+        return [compressed]
+
+    def compress(self, body, encoding):
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)  # wbits=31: gzip container
+        return compressor.compress(body) + compressor.flush()
+
+    @staticmethod
+    def close(app_iter):
+        if hasattr(app_iter, "close"):
+            app_iter.close()
+
+    def stream(self, chunks, encoding):
+        """
+        Compress streamed responses, flushing once stream_buffer bytes have gathered: flushing after every
+        small chunk (one NDJSON line, say) would reset the compressor's context and nearly triple the size.
+        """
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            flush = lambda data: compressor.process(data) + compressor.flush()
+            finish = compressor.finish
+        else:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+            flush = lambda data: compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            finish = compressor.flush
+        pending, pending_size = [], 0
+        for chunk in chunks:
+            pending.append(chunk)
+            pending_size += len(chunk)
+            if pending_size >= self.stream_buffer:
+                data = flush(b"".join(pending))
+                pending, pending_size = [], 0
+                if data:
+                    yield data
+        yield flush(b"".join(pending)) + finish()
+
+    @staticmethod
+    def add_vary(headers):
+        for i, (name, value) in enumerate(headers):
+            if name.lower() == "vary":
+                values = [item.strip().lower() for item in value.split(",")]
+                if "accept-encoding" not in values and "*" not in values:
+                    headers[i] = (name, f"{value}, Accept-Encoding")
+                return headers
+        return headers + [("Vary", "Accept-Encoding")]
+
+    @staticmethod
+    def weaken_etag(etag):
+        # The compressed bytes differ from the original, so a strong validator no longer holds
+        return etag if etag.startswith("W/") else f"W/{etag}"
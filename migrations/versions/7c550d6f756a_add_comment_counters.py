@@ -0,0 +1,51 @@
+"""Add comment_count to blog_posts and reply_count to comments
+
+Revision ID: 7c550d6f756a
+Revises: d0ab51a00e06
+Create Date: 2026-10-19 07:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c550d6f756a'
+down_revision = 'd0ab51a00e06'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+comments = sa.table("comments", sa.column("id", sa.Integer), sa.column("post_id", sa.Integer),
+                    sa.column("parent_id", sa.Integer), sa.column("reply_count", sa.Integer))
+posts = sa.table("blog_posts", sa.column("id", sa.Integer), sa.column("comment_count", sa.Integer))
+
+
+def backfill(table, counter, counted):
+    # One GROUP BY and keyed updates for the non-zero rows; a correlated subquery per row would
+    # scan comments once per row, as neither post_id nor parent_id is indexed
+    bind = op.get_bind()
+    counts = bind.execute(
+        sa.select(counted, sa.func.count()).where(counted.is_not(None)).group_by(counted)
+    ).all()
+    update = sa.update(table).where(table.c.id == sa.bindparam("row_id")).values({counter: sa.bindparam("total")})
+    for start in range(0, len(counts), BATCH_SIZE):
+        bind.execute(update, [{"row_id": row_id, "total": total} for row_id, total in counts[start:start + BATCH_SIZE]])
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if "comment_count" not in {column["name"] for column in inspector.get_columns("blog_posts")}:
+        op.add_column("blog_posts", sa.Column("comment_count", sa.Integer(), nullable=False, server_default="0"))
+        backfill(posts, "comment_count", comments.c.post_id)
+    if "reply_count" not in {column["name"] for column in inspector.get_columns("comments")}:
+        op.add_column("comments", sa.Column("reply_count", sa.Integer(), nullable=False, server_default="0"))
+        backfill(comments, "reply_count", comments.c.parent_id)
+
+
+def downgrade():
+    with op.batch_alter_table("comments") as batch_op:
+        batch_op.drop_column("reply_count")
+    with op.batch_alter_table("blog_posts") as batch_op:
+        batch_op.drop_column("comment_count")
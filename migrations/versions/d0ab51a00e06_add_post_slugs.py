@@ -0,0 +1,80 @@
+"""Add indexed category_slug and post_slug columns to blog_posts
+
+Revision ID: d0ab51a00e06
+Revises:
+Create Date: 2026-10-19 06:30:00.000000
+
+This is the first revision: databases created by db.create_all() before it are upgraded in place,
+and ones created after it already have the columns, so every step checks what is there first.
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd0ab51a00e06'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def slugify(text):
+    # Copy of slugs.slugify at the time of this revision, so later changes there don't alter the backfill
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    folded = "".join(char for char in decomposed if not unicodedata.combining(char))
+    slug = re.sub(r"[^a-z0-9]+", "-", folded.replace("ı", "i")).strip("-")
+    return slug or "untitled"
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("blog_posts")}
+    indexes = {index["name"] for index in inspector.get_indexes("blog_posts")}
+
+    added = [name for name in ("category_slug", "post_slug") if name not in columns]
+    for name in added:
+        op.add_column("blog_posts", sa.Column(name, sa.String(), nullable=True))
+
+    if added:
+        posts = sa.table(
+            "blog_posts",
+            sa.column("id", sa.Integer),
+            sa.column("title", sa.String),
+            sa.column("category", sa.String),
+            sa.column("category_slug", sa.String),
+            sa.column("post_slug", sa.String),
+        )
+        bind = op.get_bind()
+        rows = bind.execute(sa.select(posts.c.id, posts.c.title, posts.c.category)).all()
+        update = (
+            sa.update(posts)
+            .where(posts.c.id == sa.bindparam("post_id"))
+            .values(category_slug=sa.bindparam("new_category_slug"), post_slug=sa.bindparam("new_post_slug"))
+        )
+        for start in range(0, len(rows), BATCH_SIZE):
+            bind.execute(update, [
+                {"post_id": post_id, "new_category_slug": slugify(category), "new_post_slug": slugify(title)}
+                for post_id, title, category in rows[start:start + BATCH_SIZE]
+            ])
+
+        # SQLite can't tighten a column in place; batch mode rebuilds the table there
+        with op.batch_alter_table("blog_posts") as batch_op:
+            for name in added:
+                batch_op.alter_column(name, existing_type=sa.String(), nullable=False)
+
+    for name in ("category_slug", "post_slug"):
+        if f"ix_blog_posts_{name}" not in indexes:
+            op.create_index(f"ix_blog_posts_{name}", "blog_posts", [name])
+
+
+def downgrade():
+    op.drop_index("ix_blog_posts_post_slug", table_name="blog_posts")
+    op.drop_index("ix_blog_posts_category_slug", table_name="blog_posts")
+    with op.batch_alter_table("blog_posts") as batch_op:
+        batch_op.drop_column("post_slug")
+        batch_op.drop_column("category_slug")
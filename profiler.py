@@ -0,0 +1,103 @@
+# Opt-in per-request profiling: cProfile plus the SQL statements the request ran
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_active = threading.local()  # The RequestProfile of the request running on this thread, if any
+
+
+class RequestProfile:
+    """One profiled request: the cProfile run and (statement, parameters, seconds) for each query."""
+
+    def __init__(self, label):
+        self.label = label
+        self.queries = []
+        self.profile = cProfile.Profile()
+        self.started = time.perf_counter()
+        self.elapsed = None
+
+    def report(self, sort="cumulative", limit=60):
+        """Plain-text report: wall time, the SQL statements slowest first, then the pstats listing."""
+        out = io.StringIO()
+        sql_total = sum(seconds for _, _, seconds in self.queries)
+        out.write(f"{self.label}\n")
+        out.write(f"wall {self.elapsed * 1000:.1f} ms, {len(self.queries)} queries, sql {sql_total * 1000:.1f} ms\n\n")
+        for statement, parameters, seconds in sorted(self.queries, key=lambda q: q[2], reverse=True):
+            out.write(f"{seconds * 1000:8.2f} ms  {' '.join(statement.split())}  {parameters!r}\n")
+        out.write("\n")
+        pstats.Stats(self.profile, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+class Profiler:
+    """
+    Starts and stops RequestProfiles and writes them to report_dir as NAME.prof (pstats) and NAME.txt.
+    The SQLAlchemy listeners are only installed on the first profiled request, so a worker nobody
+    profiles runs no extra code per query.
+    """
+
+    def __init__(self, report_dir, keep=50):
+        self.report_dir = report_dir
+        self.keep = keep
+        self._listening = False
+        self._lock = threading.Lock()
+
+    def start(self, label):
+        self._listen()
+        profile = RequestProfile(label)
+        _active.profile = profile
+        profile.profile.enable()
+        return profile
+
+    def stop(self, profile):
+        profile.profile.disable()
+        profile.elapsed = time.perf_counter() - profile.started
+        _active.profile = None
+
+    def save(self, profile):
+        """Write the report pair, drop the oldest beyond `keep`, and return the report name."""
+        os.makedirs(self.report_dir, exist_ok=True)
+        slug = "".join(c if c.isalnum() else "-" for c in profile.label.lower()).strip("-")[:60]
+        name = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{slug}"
+        profile.profile.dump_stats(os.path.join(self.report_dir, f"{name}.prof"))
+        with open(os.path.join(self.report_dir, f"{name}.txt"), "w") as f:
+            f.write(profile.report())
+        for old in self.reports()[self.keep:]:
+            for ext in (".prof", ".txt"):
+                try:
+                    os.remove(os.path.join(self.report_dir, old + ext))
+                except FileNotFoundError:
+                    pass
+        return name
+
+    def reports(self):
+        """Saved report names, newest first."""
+        if not os.path.isdir(self.report_dir):
+            return []
+        return sorted((f[:-4] for f in os.listdir(self.report_dir) if f.endswith(".txt")), reverse=True)
+
+    def _listen(self):
+        with self._lock:
+            if self._listening:
+                return
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            self._listening = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_active, "profile", None) is not None:
+        context._profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = getattr(_active, "profile", None)
+    started = getattr(context, "_profile_started", None)
+    if profile is not None and started is not None:
+        profile.queries.append((statement, parameters, time.perf_counter() - started))
@@ -0,0 +1,140 @@
+# Per-client token buckets and concurrency caps for expensive endpoints
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from flask import request, Response
+
+IDLE_SECONDS = 3600  # Buckets idle this long have refilled, so they carry no state worth keeping
+
+
+class MemoryBuckets:
+    """Buckets held in this process; each gunicorn worker counts separately."""
+
+    MAX_KEYS = 10000
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        """Spend one token; return 0 if allowed, otherwise the seconds until a token is available."""
+        now = time.monotonic()
+        with self._lock:
+            if len(self._buckets) > self.MAX_KEYS:
+                self._buckets = {k: v for k, v in self._buckets.items() if now - v[1] < IDLE_SECONDS}
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / rate
+
+
+class SQLiteBuckets:
+    """Buckets in a SQLite file, shared by every worker on the host."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        connection = self._connect()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+        connection.execute("CREATE INDEX IF NOT EXISTS buckets_updated ON buckets (updated)")
+        connection.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=0.5, isolation_level=None)
+
+    def _connection(self):
+        # One connection per thread, opened lazily so nothing is inherited across fork
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    def reset(self):
+        """Forget connections inherited across fork, so every thread of the child opens its own."""
+        self._local = threading.local()
+
+    def _failed(self, connection, error):
+        """Roll back whatever the failed call left open, dropping the connection if even that fails."""
+        print(f"Rate limiter store unavailable, letting request through: {error}")
+        try:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+        except sqlite3.Error:
+            connection.close()
+            self._local.connection = None
+
+    def take(self, key, rate, burst):
+        now = time.time()
+        connection = self._connection()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (burst, now)
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            connection.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                (key, tokens - 1 if allowed else tokens, now),
+            )
+            connection.execute("COMMIT")
+            if random.random() < 0.01:
+                connection.execute("DELETE FROM buckets WHERE updated < ?", (now - IDLE_SECONDS,))
+        except sqlite3.Error as e:
+            self._failed(connection, e)
+            return 0
+        return 0 if allowed else (1 - tokens) / rate
+
+
+class RateLimiter:
+    """
+    Decorates views with a token bucket per client IP (request.remote_addr, set by ProxyFix) and an
+    optional cap on concurrent requests. Rejections return before the view runs and are counted.
+    """
+
+    def __init__(self, buckets, enabled=True):
+        self.buckets = buckets
+        self.enabled = enabled
+        self.rejections = Counter()
+
+    def limit(self, name, rate, burst, concurrency=None, methods=None):
+        """Allow `rate` requests per second per client with bursts of `burst`, for `methods` (default: all)."""
+        def decorator(func):
+            slots = threading.BoundedSemaphore(concurrency) if concurrency else None
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or (methods and request.method not in methods):
+                    return func(*args, **kwargs)
+
+                retry_after = self.buckets.take(f"{name}:{request.remote_addr}", rate, burst)
+                if retry_after:
+                    self.rejections[f"{name}:rate"] += 1
+                    return self.reject(429, retry_after)
+
+                if slots and not slots.acquire(blocking=False):
+                    self.rejections[f"{name}:concurrency"] += 1
+                    return self.reject(503, 1)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    if slots:
+                        slots.release()
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def reject(status, retry_after):
+        message = "Too many requests, please slow down." if status == 429 else "Server busy, please retry shortly."
+        response = Response(message, status=status, mimetype="text/plain")
+        response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+        return response
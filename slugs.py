@@ -0,0 +1,15 @@
+# Text folding shared by URL slugs and search, and the slugs for categories and post titles
+import re
+import unicodedata
+
+
+def normalize(text):
+    """Lowercase and strip accents so "turk" finds "Türkiye"."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def slugify(text):
+    """"Türkiye Geçilmez" -> "turkiye-gecilmez": accents dropped, every run of other characters becomes one hyphen."""
+    slug = re.sub(r"[^a-z0-9]+", "-", normalize(text).replace("ı", "i")).strip("-")
+    return slug or "untitled"
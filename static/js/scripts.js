@@ -154,3 +154,62 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 });
+
+
+// Search-as-you-type suggestions, debounced so only the last keystroke hits the server
+document.addEventListener('DOMContentLoaded', function() {
+    const searchInput = document.getElementById('searchInput');
+    const suggestionList = document.getElementById('searchSuggestions');
+    if (!searchInput || !suggestionList) {
+        return;
+    }
+
+    let debounceTimer = null;
+    let pendingRequest = null;
+
+    function hideSuggestions() {
+        suggestionList.classList.remove('show');
+        suggestionList.innerHTML = '';
+    }
+
+    function showSuggestions(suggestions) {
+        suggestionList.innerHTML = '';
+        suggestions.forEach(suggestion => {
+            const item = document.createElement('li');
+            const link = document.createElement('a');
+            link.className = 'dropdown-item';
+            link.href = suggestion.url;
+            link.textContent = suggestion.type === 'category' ? `${suggestion.label} (category)` : suggestion.label;
+            item.appendChild(link);
+            suggestionList.appendChild(item);
+        });
+        suggestionList.classList.toggle('show', suggestions.length > 0);
+    }
+
+    searchInput.addEventListener('input', function() {
+        clearTimeout(debounceTimer);
+        const query = searchInput.value.trim();
+        if (query.length < 2) {
+            hideSuggestions();
+            return;
+        }
+
+        debounceTimer = setTimeout(() => {
+            if (pendingRequest) {
+                pendingRequest.abort(); // Drop the answer to an older query
+            }
+            pendingRequest = new AbortController();
+            fetch(`${searchInput.dataset.suggestUrl}?q=${encodeURIComponent(query)}`, { signal: pendingRequest.signal })
+                .then(response => response.json())
+                .then(data => showSuggestions(data.suggestions))
+                .catch(error => {
+                    if (error.name !== 'AbortError') {
+                        console.error('Error:', error);
+                    }
+                });
+        }, 200);
+    });
+
+    // Delay hiding so a click on a suggestion still follows its link
+    searchInput.addEventListener('blur', () => setTimeout(hideSuggestions, 200));
+});
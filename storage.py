@@ -0,0 +1,48 @@
+# Storage backends for uploaded media
+import os
+
+
+class LocalStorage:
+    """Files under the app's static folder (development and tests)."""
+
+    def __init__(self, root, url_prefix="/static/uploads"):
+        self.root = root
+        self.url_prefix = url_prefix.rstrip("/")
+
+    def save(self, path, data, content_type):
+        full_path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "wb") as f:
+            f.write(data)
+
+    def url(self, path):
+        return f"{self.url_prefix}/{path}"
+
+
+class SupabaseStorage:
+    """A public Supabase Storage bucket (production)."""
+
+    def __init__(self, get_client, bucket):
+        # The client is recreated after every gunicorn fork, so look it up on each call
+        self.get_client = get_client
+        self.bucket = bucket
+
+    def save(self, path, data, content_type):
+        self.get_client().storage.from_(self.bucket).upload(
+            path,
+            data,
+            {"content-type": content_type, "cache-control": "31536000", "upsert": "true"},
+        )
+
+    def url(self, path):
+        return self.get_client().storage.from_(self.bucket).get_public_url(path)
+
+
+def create_storage(app, get_supabase):
+    """Pick the backend named by IMAGE_STORAGE ("local" or "supabase")."""
+    backend = os.getenv('IMAGE_STORAGE', 'local')
+    if backend == 'supabase':
+        return SupabaseStorage(get_supabase, os.getenv('SUPABASE_STORAGE_BUCKET', 'blog-images'))
+    if backend == 'local':
+        return LocalStorage(os.path.join(app.static_folder, 'uploads'))
+    raise ValueError(f"Unknown IMAGE_STORAGE backend: {backend}")
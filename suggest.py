@@ -0,0 +1,77 @@
+# In-process prefix index for search-as-you-type over post titles and category names
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from slugs import normalize
+
+
+def word_suffixes(text):
+    """Every suffix of the normalized text that starts at a word, so any word of a title can be a prefix."""
+    normalized = normalize(text).strip()
+    return {normalized[i:] for i, char in enumerate(normalized)
+            if char.isalnum() and (i == 0 or not normalized[i - 1].isalnum())}
+
+
+class SuggestIndex:
+    """
+    A sorted array of (suffix, kind, label, ref) tuples searched with bisect, where ref is the
+    category name or (post id, category). Titles and categories are added and removed one post
+    at a time, so saves don't need a full rebuild.
+    """
+
+    def __init__(self):
+        self._entries = []
+        self._posts = {}  # post id -> (title, category) currently indexed
+        self._categories = Counter()  # category -> number of indexed posts
+        self._lock = threading.Lock()
+
+    def _add(self, kind, label, ref):
+        for suffix in word_suffixes(label):
+            insort(self._entries, (suffix, kind, label, ref))
+
+    def _remove(self, kind, label, ref):
+        for suffix in word_suffixes(label):
+            position = bisect_left(self._entries, (suffix, kind, label, ref))
+            if position < len(self._entries) and self._entries[position] == (suffix, kind, label, ref):
+                del self._entries[position]
+
+    def add_post(self, post_id, title, category):
+        with self._lock:
+            self._remove_post(post_id)
+            self._posts[post_id] = (title, category)
+            self._add("post", title, (post_id, category))
+            self._categories[category] += 1
+            if self._categories[category] == 1:
+                self._add("category", category, category)
+
+    def remove_post(self, post_id):
+        with self._lock:
+            self._remove_post(post_id)
+
+    def _remove_post(self, post_id):
+        if post_id not in self._posts:
+            return
+        title, category = self._posts.pop(post_id)
+        self._remove("post", title, (post_id, category))
+        self._categories[category] -= 1
+        if not self._categories[category]:
+            del self._categories[category]
+            self._remove("category", category, category)
+
+    def search(self, query, limit=8):
+        """Return up to `limit` (kind, label, ref) matches, categories first, without duplicates."""
+        prefix = normalize(query).strip()
+        if not prefix:
+            return []
+        matches = {}
+        with self._lock:
+            position = bisect_left(self._entries, (prefix,))
+            # Stop early on short prefixes; a few spare matches leave room to put categories first
+            while position < len(self._entries) and len(matches) < limit * 4:
+                suffix, kind, label, ref = self._entries[position]
+                if not suffix.startswith(prefix):
+                    break
+                matches.setdefault((kind, ref), (kind, label, ref))
+                position += 1
+        # Categories are few, so list them ahead of individual posts
+        return sorted(matches.values(), key=lambda match: (match[0] != "category", match[1]))[:limit]
@@ -0,0 +1,43 @@
+# Fragment caching for Jinja templates: {% cache "name", ttl[, vary...] %}...{% endcache %}
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from cache import Cache, LRUBackend
+
+
+class FragmentCache:
+    """Rendered fragments stored in a cache.Cache (in-process unless the app hands over a shared one)."""
+
+    def __init__(self, cache=None):
+        self.cache = cache or Cache(LRUBackend())
+
+    def get_or_render(self, key, ttl, render):
+        return self.cache.get_or_set("fragments", repr(key), ttl, render)
+
+    def clear(self):
+        self.cache.invalidate("fragments")
+
+
+class FragmentCacheExtension(Extension):
+    """
+    Cache the rendered body of a block. Values after the TTL are added to the key, e.g.
+    {% cache "navbar", 3600, current_user.is_authenticated %} renders once per login state.
+    """
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=FragmentCache())
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(self.call_method("_render", [nodes.List(args)]), [], [], body).set_lineno(lineno)
+
+    def _render(self, args, caller):
+        name, ttl, *vary = args
+        key = (name, *vary)
+        return Markup(self.environment.fragment_cache.get_or_render(key, ttl, lambda: str(caller())))
@@ -0,0 +1,51 @@
+# app.py configures itself from the environment when imported, so everything is set here, before any test imports it
+import os
+import tempfile
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+_tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("MAIL_SECRET_KEY", "test")
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "sb_publishable_test")
+os.environ["CACHE_BACKEND"] = "memory"
+os.environ["RATE_LIMIT_ENABLED"] = "0"
+os.environ["FREEZE_PAGES"] = "off"
+os.environ["FROZEN_PAGES_DIR"] = os.path.join(_tmp, "frozen")
+os.environ["PROFILE_DIR"] = os.path.join(_tmp, "profiles")
+
+import app as site  # noqa: E402
+
+site.app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+
+ADMIN_PASSWORD = "Passw0rd!"
+
+
+@pytest.fixture(scope="module")
+def empty_db():
+    """Recreate every table and drop cached rows, so each test module starts from nothing."""
+    with site.app.app_context():
+        site.db.drop_all()
+        site.db.create_all()
+    site.shared_cache.invalidate("posts")
+    site.app.jinja_env.fragment_cache.clear()
+    return site
+
+
+@pytest.fixture(scope="module")
+def seeded(empty_db):
+    """One admin (id 1) and one published post (id 1) in "Test Category"."""
+    with site.app.app_context():
+        admin = site.User(email="admin@example.com", password=generate_password_hash(ADMIN_PASSWORD), name="Admin")
+        site.db.session.add(admin)
+        site.db.session.flush()
+        site.db.session.add(site.Post(
+            author_id=admin.id, title="Hello World", date="January 1, 2026", body="<p>Hello</p>",
+            img_url="https://example.com/cover.jpg", category="Test Category", status="published",
+        ))
+        site.db.session.commit()
+    site.shared_cache.invalidate("posts")
+    return site
@@ -0,0 +1,73 @@
+# The JSON API pages with opaque cursors, rejects bad input with 400 and answers unchanged polls with 304
+import pytest
+
+
+@pytest.fixture(scope="module")
+def client(seeded):
+    site = seeded
+    with site.app.app_context():
+        for number in range(2, 7):
+            site.db.session.add(site.Post(
+                author_id=1, title=f"Post {number}", date="January 2, 2026", body="<p>Body</p>",
+                img_url="https://example.com/cover.jpg", category="Türkiye Geçilmez",
+                status="draft" if number == 6 else "published",
+            ))
+        site.db.session.commit()
+    site.shared_cache.invalidate("posts")
+    return site.app.test_client()
+
+
+def test_cursor_pages_through_published_posts(client):
+    ids, query = [], {"limit": 2, "fields": "title"}
+    for _ in range(10):
+        response = client.get("/api/v1/posts", query_string=query)
+        assert response.status_code == 200
+        ids += [post["id"] for post in response.json["data"]]
+        if response.json["next_cursor"] is None:
+            break
+        query["cursor"] = response.json["next_cursor"]
+    assert ids == [5, 4, 3, 2, 1]  # newest first, the draft (6) left out
+
+
+def test_fields_selects_columns(client):
+    response = client.get("/api/v1/posts", query_string={"fields": "title, category_slug", "category": "Türkiye Geçilmez"})
+    assert response.status_code == 200
+    assert response.json["data"][0] == {"id": 5, "title": "Post 5", "category_slug": "turkiye-gecilmez"}
+    assert len(response.json["data"]) == 4
+
+
+@pytest.mark.parametrize("url", ["/api/v1/posts?fields=title,password", "/api/v1/posts/1?fields=author_id"])
+def test_unknown_field_is_rejected(client, url):
+    response = client.get(url)
+    assert response.status_code == 400
+    assert "Unknown field" in response.json["error"]
+
+
+@pytest.mark.parametrize("query", [
+    {"cursor": "!!!"},
+    {"cursor": "bm90LWFuLWlk"},  # base64 of "not-an-id"
+    {"cursor": "/w"},  # not UTF-8 once decoded
+    {"limit": "ten"},
+    {"limit": "0"},
+])
+def test_bad_cursor_or_limit_is_rejected(client, query):
+    response = client.get("/api/v1/posts", query_string=query)
+    assert response.status_code == 400
+    assert response.json["error"] == "Invalid limit or cursor."
+
+
+@pytest.mark.parametrize("url", ["/api/v1/posts", "/api/v1/posts/1", "/api/v1/categories", "/api/v1/posts/1/comments"])
+def test_etag_answers_304(client, url):
+    response = client.get(url)
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+    unchanged = client.get(url, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.data == b""
+    assert client.get(url, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_cursor_round_trip(seeded):
+    assert seeded.decode_cursor(seeded.encode_cursor(12345)) == 12345
+    with pytest.raises(ValueError):
+        seeded.decode_cursor("!!!")
@@ -0,0 +1,181 @@
+# Cache backends: LRU eviction and TTL, group versions, SQLite failure recovery and the RESP client
+import io
+import pickle
+import sqlite3
+
+import pytest
+
+import cache
+from cache import Cache, LRUBackend, RedisBackend, SQLiteBackend
+
+
+def test_lru_evicts_least_recently_used():
+    backend = LRUBackend(max_entries=2)
+    backend.set_many({"a": 1, "b": 2}, ttl=None)
+    backend.get_many(["a"])  # "b" is now the oldest
+    backend.set_many({"c": 3}, ttl=None)
+    assert backend.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+
+
+def test_lru_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    backend = LRUBackend()
+    backend.set_many({"a": 1}, ttl=10)
+    backend.set_many({"b": 2}, ttl=None)
+    now[0] += 11
+    assert backend.get_many(["a", "b"]) == {"b": 2}
+
+
+@pytest.mark.parametrize("make_backend", [
+    lambda tmp_path: LRUBackend(),
+    lambda tmp_path: SQLiteBackend(str(tmp_path / "cache.db")),
+], ids=["lru", "sqlite"])
+def test_invalidate_hides_old_entries(make_backend, tmp_path):
+    posts = Cache(make_backend(tmp_path))
+    posts.set("posts", "page-1", "old")
+    posts.set("users", "page-1", "kept")
+    assert posts.get("posts", "page-1") == "old"
+    posts.invalidate("posts")
+    assert posts.get("posts", "page-1") is None
+    assert posts.get("users", "page-1") == "kept"
+    assert posts.get_or_set("posts", "page-1", 60, lambda: "new") == "new"
+    assert posts.get("posts", "page-1") == "new"
+
+
+def test_sqlite_locked_write_is_a_miss_and_recovers(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"))
+    other = sqlite3.connect(backend.path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    backend.set_many({"a": 1}, ttl=None)
+    assert backend.incr("hits") is None
+    other.execute("ROLLBACK")
+    backend.set_many({"a": 1}, ttl=None)
+    assert backend.get_many(["a"]) == {"a": 1}
+
+
+def test_sqlite_error_inside_transaction_rolls_back(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"))
+    connection = backend._connection()
+    connection.execute("DROP TABLE cache")
+    backend.set_many({"a": 1}, ttl=None)  # BEGIN succeeds, the INSERT fails
+    assert not connection.in_transaction
+    connection.execute("CREATE TABLE cache (key TEXT PRIMARY KEY, value BLOB, expires REAL)")
+    backend.set_many({"a": 1}, ttl=None)
+    assert backend.get_many(["a"]) == {"a": 1}
+
+
+def test_sqlite_failed_rollback_drops_the_connection(tmp_path):
+    class BrokenConnection:
+        in_transaction = True
+        closed = False
+
+        def execute(self, statement):
+            raise sqlite3.OperationalError("disk I/O error")
+
+        def close(self):
+            self.closed = True
+
+    backend = SQLiteBackend(str(tmp_path / "cache.db"))
+    broken = backend._local.connection = BrokenConnection()
+    backend._failed(broken, sqlite3.OperationalError("disk I/O error"))
+    assert broken.closed
+    assert backend._local.connection is None
+    assert backend._connection() is not broken
+
+
+def test_sqlite_reset_forgets_the_inherited_connection(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"))
+    inherited = backend._connection()
+    backend.reset()
+    assert backend._connection() is not inherited
+
+
+class FakeSocket:
+    """Records what the client sends and answers with canned replies."""
+
+    def __init__(self, replies):
+        self.sent = b""
+        self.replies = io.BytesIO(replies)
+        self.closed = False
+
+    def sendall(self, data):
+        self.sent += data
+
+    def makefile(self, mode):
+        return self.replies
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    sockets = []
+
+    def connect(replies):
+        monkeypatch.setattr(cache.socket, "create_connection", lambda address, timeout: sockets.pop(0))
+        sockets.append(FakeSocket(replies))
+        return sockets[-1]
+
+    return connect
+
+
+def test_resp_encoding():
+    assert RedisBackend._encode(("SET", "k", b"\x00v", "EX", 60)) == (
+        b"*5\r\n$3\r\nSET\r\n$1\r\nk\r\n$2\r\n\x00v\r\n$2\r\nEX\r\n$2\r\n60\r\n"
+    )
+
+
+def test_resp_replies(fake_redis):
+    stored = pickle.dumps("value")
+    sock = fake_redis(b"*2\r\n$%d\r\n%s\r\n$-1\r\n" % (len(stored), stored) + b":5\r\n+OK\r\n$-1\r\n")
+    backend = RedisBackend("redis://localhost:6379/0")
+    assert backend.get_many(["a", "b"]) == {"a": "value"}
+    assert backend.incr("hits") == 5
+    backend.set_many({"a": 1}, ttl=30)
+    assert backend.counter("missing") == 0
+    assert sock.sent.startswith(b"*3\r\n$4\r\nMGET\r\n$1\r\na\r\n$1\r\nb\r\n")
+    assert not sock.closed
+
+
+def test_resp_auth_and_select(fake_redis):
+    sock = fake_redis(b"+OK\r\n+OK\r\n:1\r\n")
+    backend = RedisBackend("redis://:secret@localhost:6379/2")
+    assert backend.incr("hits") == 1
+    assert sock.sent == RedisBackend._encode(("AUTH", "secret")) + RedisBackend._encode(("SELECT", 2)) + \
+        RedisBackend._encode(("INCR", "hits"))
+
+
+@pytest.mark.parametrize("reply", [b"-NOAUTH Authentication required.\r\n", b"-OOM out of memory\r\n", b"?junk\r\n", b""])
+def test_resp_error_reply_is_a_miss_and_drops_the_connection(fake_redis, reply):
+    # A pipelined SET whose first reply is an error leaves the second unread; reusing the
+    # connection would hand that stale reply to the next command
+    sock = fake_redis(reply + b"+OK\r\n")
+    backend = RedisBackend("redis://localhost:6379/0")
+    backend.set_many({"a": 1, "b": 2}, ttl=None)
+    assert sock.closed
+    assert backend._local.connection is None
+
+    fresh = fake_redis(b":7\r\n")
+    assert backend.incr("hits") == 7
+    assert not fresh.closed
+
+
+def test_redis_reset_opens_a_new_socket(fake_redis):
+    inherited = fake_redis(b":1\r\n")
+    backend = RedisBackend("redis://localhost:6379/0")
+    assert backend.incr("hits") == 1
+    backend.reset()
+    fresh = fake_redis(b":2\r\n")
+    assert backend.incr("hits") == 2
+    assert inherited.sent == RedisBackend._encode(("INCR", "hits"))
+    assert fresh.sent == RedisBackend._encode(("INCR", "hits"))
+
+
+def test_resp_auth_failure_is_a_miss(fake_redis):
+    sock = fake_redis(b"-WRONGPASS invalid username-password pair\r\n")
+    backend = RedisBackend("redis://:wrong@localhost:6379/0")
+    assert backend.get_many(["a"]) == {}
+    assert sock.closed
+    assert backend._local.connection is None
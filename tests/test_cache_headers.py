@@ -0,0 +1,41 @@
+# Anonymous GETs of cacheable pages must not set a cookie, so CDNs and shared proxies can store them
+import pytest
+
+CACHEABLE_URLS = [
+    "/",
+    "/about",
+    "/blog",
+    "/blog/test-category",
+    "/test-category",
+    "/test-category/post/1",
+    "/search?q=hello",
+    "/api/v1/posts",
+    "/api/v1/posts/1",
+    "/api/v1/categories",
+    "/api/v1/posts/1/comments",
+]
+
+
+@pytest.fixture(scope="module")
+def client(seeded):
+    return seeded.app.test_client()
+
+
+@pytest.mark.parametrize("url", CACHEABLE_URLS)
+def test_anonymous_get_is_public_and_sets_no_cookie(seeded, client, url):
+    client.delete_cookie(seeded.app.config["SESSION_COOKIE_NAME"])
+    response = client.get(url)
+    assert response.status_code == 200
+    assert "Set-Cookie" not in response.headers
+    assert response.cache_control.public
+    assert response.cache_control.max_age == seeded.PUBLIC_CACHE_MAX_AGE
+
+
+def test_logged_in_get_is_private(client):
+    with client.session_transaction() as session:
+        session["_user_id"] = "1"
+        session["_fresh"] = True
+    response = client.get("/test-category/post/1")
+    assert response.status_code == 200
+    assert response.cache_control.private
+    assert not response.cache_control.public
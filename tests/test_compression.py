@@ -0,0 +1,71 @@
+# CompressionMiddleware must work with any WSGI app, not only Flask, and always close the app's iterable
+import gzip
+
+import pytest
+
+from middleware import CompressionMiddleware
+
+BODY = b"line of text\n" * 400
+
+
+def generator_app(content_type="text/plain", length=False, closed=None):
+    """A WSGI app that only calls start_response once the server starts iterating."""
+    def app(environ, start_response):
+        try:
+            headers = [("Content-Type", content_type)]
+            if length:
+                headers.append(("Content-Length", str(len(BODY))))
+            start_response("200 OK", headers)
+            for start in range(0, len(BODY), 1000):
+                yield BODY[start:start + 1000]
+        finally:
+            if closed is not None:
+                closed.append(True)
+    return app
+
+
+def call(app, accept_encoding="gzip"):
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response["status"], response["headers"] = status, dict(headers)
+
+    environ = {"REQUEST_METHOD": "GET", "HTTP_ACCEPT_ENCODING": accept_encoding}
+    return CompressionMiddleware(app)(environ, start_response), response
+
+
+@pytest.mark.parametrize("length", [False, True], ids=["streamed", "content-length"])
+def test_generator_app_is_compressed(length):
+    closed = []
+    app_iter, response = call(generator_app(length=length, closed=closed))
+    body = b"".join(app_iter)
+    CompressionMiddleware.close(app_iter)
+    assert response["status"] == "200 OK"
+    assert response["headers"]["Content-Encoding"] == "gzip"
+    assert gzip.decompress(body) == BODY
+    assert closed
+
+
+def test_generator_app_passes_through_uncompressible():
+    closed = []
+    app_iter, response = call(generator_app(content_type="image/png", closed=closed))
+    assert "Content-Encoding" not in response["headers"]
+    assert b"".join(app_iter) == BODY
+    app_iter.close()
+    assert closed
+
+
+@pytest.mark.parametrize("content_type", ["text/plain", "image/png"])
+def test_close_before_iteration_closes_the_app(content_type):
+    closed = []
+    app_iter, _ = call(generator_app(content_type=content_type, closed=closed))
+    app_iter.close()
+    assert closed
+
+
+def test_app_that_never_starts_a_response_is_an_error():
+    def app(environ, start_response):
+        return iter([])
+
+    with pytest.raises(RuntimeError):
+        call(app)
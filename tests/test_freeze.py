@@ -0,0 +1,46 @@
+# Frozen pages answer exactly the URLs Flask would, with the site's public max-age
+import pytest
+from werkzeug.test import Client
+from werkzeug.wrappers import Response
+
+from freeze import FrozenPages
+
+
+def not_found(environ, start_response):
+    return Response("from the app", status=404)(environ, start_response)
+
+
+@pytest.fixture
+def pages(tmp_path):
+    pages = FrozenPages(not_found, str(tmp_path), {"session"}, max_age=1234)
+    pages.write("/", b"<p>home</p>")
+    pages.write("/about", b"<p>about</p>")
+    pages.write("/test-category/post/1", b"<p>post</p>")
+    pages.enabled = True
+    return pages
+
+
+@pytest.mark.parametrize("url, body", [
+    ("/", b"<p>home</p>"),
+    ("/about", b"<p>about</p>"),
+    ("/test-category/post/1", b"<p>post</p>"),
+])
+def test_frozen_page_is_served(pages, url, body):
+    response = Client(pages).get(url)
+    assert response.status_code == 200
+    assert response.data == body
+    assert response.headers["Cache-Control"] == "public, max-age=1234"
+
+
+@pytest.mark.parametrize("path", ["/about/", "/test-category/post/1/", "//about", "/test-category//post/1"])
+def test_non_canonical_url_goes_to_the_app(pages, path):
+    # Set PATH_INFO directly: the test client would read "//about" as a host name
+    response = Client(pages).get("/", environ_overrides={"PATH_INFO": path})
+    assert response.status_code == 404
+    assert response.data == b"from the app"
+
+
+def test_session_cookie_goes_to_the_app(pages):
+    client = Client(pages)
+    client.set_cookie("session", "abc")
+    assert client.get("/about").status_code == 404
@@ -0,0 +1,46 @@
+# The return-to-after-login URL arrives in ?next=, so it must never send the user off the site
+import pytest
+
+from conftest import ADMIN_PASSWORD
+
+OFFSITE = [
+    "//evil.com",
+    "///evil.com",
+    "/\\evil.com",
+    "/\\/evil.com",
+    "/\t/evil.com",
+    "/\n/evil.com",
+    "https://evil.com/",
+    "http:/evil.com",
+    "javascript:alert(1)",
+    "evil.com",
+    "",
+]
+
+
+@pytest.mark.parametrize("target", OFFSITE)
+def test_offsite_targets_are_unsafe(seeded, target):
+    assert not seeded.is_safe_url(target)
+
+
+@pytest.mark.parametrize("target", ["/", "/test-category/post/1", "/search?q=a//b", "/blog#top"])
+def test_site_paths_are_safe(seeded, target):
+    assert seeded.is_safe_url(target)
+
+
+def login(app, target):
+    return app.test_client().post(
+        "/login", query_string={"next": target}, data={"email": "admin@example.com", "password": ADMIN_PASSWORD}
+    )
+
+
+@pytest.mark.parametrize("target", OFFSITE)
+def test_login_ignores_offsite_next(seeded, target):
+    response = login(seeded.app, target)
+    assert response.status_code == 302
+    assert response.headers["Location"] == "/"
+
+
+def test_login_returns_to_next(seeded):
+    response = login(seeded.app, "/test-category/post/1")
+    assert response.headers["Location"] == "/test-category/post/1"
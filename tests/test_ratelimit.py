@@ -0,0 +1,109 @@
+# Token buckets refill at `rate`, rejections carry Retry-After, and concurrency caps answer 503
+import sqlite3
+import threading
+
+import pytest
+from flask import Flask
+
+import ratelimit
+from ratelimit import MemoryBuckets, RateLimiter, SQLiteBuckets
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(ratelimit.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def buckets(request, tmp_path):
+    return MemoryBuckets() if request.param == "memory" else SQLiteBuckets(str(tmp_path / "ratelimit.db"))
+
+
+def test_bucket_refills(buckets, clock):
+    assert buckets.take("k", rate=0.5, burst=2) == 0
+    assert buckets.take("k", rate=0.5, burst=2) == 0
+    assert buckets.take("k", rate=0.5, burst=2) == pytest.approx(2)
+    clock[0] += 1  # half a token back
+    assert buckets.take("k", rate=0.5, burst=2) == pytest.approx(1)
+    clock[0] += 1
+    assert buckets.take("k", rate=0.5, burst=2) == 0
+    assert buckets.take("other", rate=0.5, burst=2) == 0
+
+
+def test_sqlite_prunes_idle_buckets(tmp_path, clock, monkeypatch):
+    buckets = SQLiteBuckets(str(tmp_path / "ratelimit.db"))
+    buckets.take("old", rate=1, burst=5)
+    clock[0] += ratelimit.IDLE_SECONDS + 1
+    monkeypatch.setattr(ratelimit.random, "random", lambda: 0)
+    buckets.take("new", rate=1, burst=5)
+    keys = [key for key, in buckets._connection().execute("SELECT key FROM buckets")]
+    assert keys == ["new"]
+
+
+def test_sqlite_failed_rollback_drops_the_connection(tmp_path):
+    class BrokenConnection:
+        in_transaction = True
+        closed = False
+
+        def execute(self, statement, parameters=()):
+            raise sqlite3.OperationalError("disk I/O error")
+
+        def close(self):
+            self.closed = True
+
+    buckets = SQLiteBuckets(str(tmp_path / "ratelimit.db"))
+    broken = buckets._local.connection = BrokenConnection()
+    assert buckets.take("k", rate=1, burst=1) == 0  # fails open
+    assert broken.closed
+    assert buckets._connection() is not broken
+    assert buckets.take("k", rate=1, burst=1) == 0
+
+
+def make_app(**limit):
+    app = Flask(__name__)
+    limiter = RateLimiter(MemoryBuckets())
+    release = threading.Event()
+    entered = threading.Event()
+
+    @app.route("/slow")
+    @limiter.limit("slow", **limit)
+    def slow():
+        entered.set()
+        release.wait(5)
+        return "done"
+
+    @app.route("/fast")
+    @limiter.limit("fast", **limit)
+    def fast():
+        return "done"
+
+    return app, limiter, entered, release
+
+
+def test_rate_limit_sets_retry_after():
+    app, limiter, _, _ = make_app(rate=0.1, burst=1)
+    client = app.test_client()
+    assert client.get("/fast").status_code == 200
+    response = client.get("/fast")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "10"
+    assert limiter.rejections["fast:rate"] == 1
+
+
+def test_concurrency_cap_returns_503():
+    app, limiter, entered, release = make_app(rate=100, burst=100, concurrency=1)
+    first = threading.Thread(target=lambda: app.test_client().get("/slow"))
+    first.start()
+    try:
+        assert entered.wait(5)
+        response = app.test_client().get("/slow")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert limiter.rejections["slow:concurrency"] == 1
+    finally:
+        release.set()
+        first.join()
+    assert app.test_client().get("/slow").status_code == 200
@@ -0,0 +1,41 @@
+# Slugs fold Turkish and accented titles to ASCII, and old spellings of category URLs redirect to them
+import pytest
+
+from slugs import slugify
+
+
+@pytest.mark.parametrize("text, slug", [
+    ("Türkiye Geçilmez", "turkiye-gecilmez"),
+    ("ı", "i"),
+    ("İstanbul", "istanbul"),
+    ("Random Musings", "random-musings"),
+    ("  C'est la vie!  ", "c-est-la-vie"),
+    ("2026: A Year", "2026-a-year"),
+    ("?!...", "untitled"),
+    ("", "untitled"),
+])
+def test_slugify(text, slug):
+    assert slugify(text) == slug
+
+
+@pytest.mark.parametrize("url, location", [
+    ("/Test-Category/post/1", "/test-category/post/1"),
+    ("/Test%20Category/post/1", "/test-category/post/1"),
+    ("/Test Category", "/test-category"),
+    ("/Test-Category/post/1?page=2", "/test-category/post/1?page=2"),
+    ("/ABOUT", "/about"),
+])
+def test_old_urls_redirect_permanently(seeded, url, location):
+    response = seeded.app.test_client().get(url)
+    assert response.status_code == 301
+    assert response.headers["Location"] == location
+
+
+def test_canonical_url_does_not_redirect(seeded):
+    assert seeded.app.test_client().get("/test-category/post/1").status_code == 200
+
+
+def test_post_to_old_url_is_not_redirected(seeded):
+    # A 301 would turn the POST into a GET and lose the form
+    response = seeded.app.test_client().post("/Test-Category/post/1", data={})
+    assert response.status_code != 301
@@ -0,0 +1,11 @@
+# Search-as-you-type must build its index on the first request, however long the host has been up
+from suggest import SuggestIndex
+
+
+def test_first_request_builds_index_on_fresh_host(seeded, monkeypatch):
+    monkeypatch.setattr(seeded, "suggest_index", SuggestIndex())
+    monkeypatch.setattr(seeded, "suggest_index_built", None)
+    monkeypatch.setattr(seeded.time, "monotonic", lambda: 12.0)  # booted 12 seconds ago
+    response = seeded.app.test_client().get("/search/suggest", query_string={"q": "hel"})
+    assert response.status_code == 200
+    assert {"type": "post", "label": "Hello World", "url": "/test-category/post/1"} in response.json["suggestions"]